@@ -65,6 +65,7 @@ const JobRecommendation = () => {
   const [hasMore, setHasMore] = useState(true);
   const [loadingMore, setLoadingMore] = useState(false);
   const loadMoreRef = useRef(null);
+  const nextCursorRef = useRef(null);
   const initialDataFetchedRef = useRef(false);
 
   // Fetch user data either from location state or Firestore
@@ -130,7 +131,8 @@ const JobRecommendation = () => {
       const response = await axios.post("http://127.0.0.1:5001/api/recommend_jobs", {
         ...userDataToUse,
         page,
-        per_page: 6
+        per_page: 6,
+        cursor: page === 1 ? undefined : nextCursorRef.current
       });
 
       if (response.data) {
@@ -148,6 +150,7 @@ const JobRecommendation = () => {
 
         setJobRecommendations(newRecommendations);
         setHasMore(response.data.has_more === true);
+        nextCursorRef.current = response.data.next_cursor || null;
         if (page === 1) {
           setJobsLoaded(true);
           initialDataFetchedRef.current = true;
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+
+from flask import Flask, Response, jsonify, request
+from flask_cors import CORS
+
+from evaluator import evaluate_answer, evaluate_answer_stream_async
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_client import LLMError, iter_sync
+from metrics import instrument
+
+app = Flask(__name__)
+CORS(app)
+instrument(app, "interview_prep")
+
+def _question_and_answer():
+    # JSON body for fetch(), query string for EventSource (GET only)
+    data = request.get_json(silent=True) or request.args
+    return data.get("question"), data.get("answer")
+
+@app.route('/api/evaluate', methods=['POST'])
+def evaluate():
+    question, answer = _question_and_answer()
+    if not question or not answer:
+        return jsonify({"error": "question and answer are required"}), 400
+    try:
+        return jsonify({"feedback": evaluate_answer(question, answer)}), 200
+    except LLMError as e:
+        return jsonify({"error": str(e)}), 502
+
+@app.route('/api/evaluate/stream', methods=['GET', 'POST'])
+def evaluate_stream():
+    question, answer = _question_and_answer()
+    if not question or not answer:
+        return jsonify({"error": "question and answer are required"}), 400
+
+    def events():
+        try:
+            for event in iter_sync(evaluate_answer_stream_async(question, answer)):
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except LLMError as e:
+            yield f"event: error\ndata: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
+    return Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Keep reverse proxies from buffering the stream
+        "X-Accel-Buffering": "no"
+    })
+
+if __name__ == '__main__':
+    app.run(debug=True, port=5000)
@@ -1,11 +1,18 @@
-import openai
 import os
-from dotenv import load_dotenv
+import re
+import sys
+import time
 
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_client import get_client, run_sync
 
-def evaluate_answer(question, answer):
+MODEL = "gpt-3.5-turbo"
+
+# "Score: 7/10", "7 out of 10", "8.5 / 10"; the lookahead waits for the character
+# after "10" so a streamed "/10" isn't read before it could turn into "/100"
+SCORE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:/|out of)\s*10(?=\D)", re.IGNORECASE)
+
+def build_messages(question, answer):
     prompt = f"""
 Evaluate the following answer to an interview question.
 
@@ -17,18 +24,73 @@ Provide:
 1. A score out of 10
 2. Feedback: strengths and areas to improve.
 """
+    return [
+        {"role": "system", "content": "You are a strict but fair interview evaluator."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_score(text, final=False):
+    # At the end of the stream there is no next character to wait for
+    match = SCORE_PATTERN.search(text + "\n" if final else text)
+    return float(match.group(1)) if match else None
 
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a strict but fair interview evaluator."},
-            {"role": "user", "content": prompt}
-        ],
+async def evaluate_answer_async(question, answer):
+    response = await get_client("openai").chat(
+        build_messages(question, answer),
+        model=MODEL,
         temperature=0.6,
         max_tokens=250
     )
 
-    return response.choices[0].message.content.strip()
+    return response.content.strip()
+
+def evaluate_answer(question, answer):
+    return run_sync(evaluate_answer_async(question, answer))
+
+async def evaluate_answer_stream_async(question, answer):
+    """Streaming evaluate_answer: yields events as the completion arrives.
+
+    - {"event": "token", "text": ...} for each content delta
+    - {"event": "score", "score": 7.0, "seconds": ...} once, as soon as the score is readable
+    - {"event": "done", "feedback": ..., "score": ..., "first_token_seconds": ...,
+      "score_seconds": ..., "latency": ...} at the end
+
+    score_seconds is the time to the first useful byte for the UI; latency is the full completion.
+    """
+    started = time.perf_counter()
+    text, score = "", None
+    first_token_seconds = score_seconds = None
+
+    async for delta in get_client("openai").stream_chat(
+        build_messages(question, answer),
+        model=MODEL,
+        temperature=0.6,
+        max_tokens=250
+    ):
+        if first_token_seconds is None:
+            first_token_seconds = time.perf_counter() - started
+        text += delta
+        yield {"event": "token", "text": delta}
+        if score is None:
+            score = parse_score(text)
+            if score is not None:
+                score_seconds = time.perf_counter() - started
+                yield {"event": "score", "score": score, "seconds": score_seconds}
+
+    if score is None:
+        score = parse_score(text, final=True)
+        if score is not None:
+            score_seconds = time.perf_counter() - started
+            yield {"event": "score", "score": score, "seconds": score_seconds}
+
+    yield {
+        "event": "done",
+        "feedback": text.strip(),
+        "score": score,
+        "first_token_seconds": first_token_seconds,
+        "score_seconds": score_seconds,
+        "latency": time.perf_counter() - started
+    }
 
 # Demo usage
 if __name__ == "__main__":
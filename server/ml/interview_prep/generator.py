@@ -1,24 +1,36 @@
+import asyncio
+import json
 import os
-import openai
-from dotenv import load_dotenv
+import re
+import sys
+import time
+from collections import defaultdict
 
-# Load environment variables
-load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_client import get_client, run_sync
 
-# Use your OpenRouter token and custom base URL
-api_key = os.getenv("API_KEY")
-if api_key is None:
-    print("Error: API_KEY not found in the .env file.")
-    exit()
+# Questions are generated through OpenRouter (API_KEY / OPENROUTER_BASE_URL in .env)
+PROVIDER = "openrouter"
+MODEL = "openai/gpt-3.5-turbo"
 
-print("API_KEY successfully loaded.")
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt_templates")
+CATEGORIES = ("technical", "behavioral", "general")
 
-# Configure OpenRouter
-openai.api_key = api_key
-openai.api_base = "https://openrouter.ai/api/v1"
+# Questions asked for in one request; larger sets are split and sent in parallel
+MAX_QUESTIONS_PER_PROMPT = 10
+TOKENS_PER_QUESTION = 80
+
+def load_templates():
+    templates = {}
+    for category in CATEGORIES:
+        with open(os.path.join(TEMPLATE_DIR, f"{category}.txt"), encoding="utf-8") as f:
+            templates[category] = f.read().strip()
+    return templates
+
+TEMPLATES = load_templates()
 
 # Function to generate interview question for different categories
-def generate_question(skills, job_role, category, disability_type, location, salary):
+async def generate_question_async(skills, job_role, category, disability_type, location, salary):
     try:
         # Craft the system message based on inputs
         system_message = f"""
@@ -42,35 +54,155 @@ def generate_question(skills, job_role, category, disability_type, location, sal
             user_message += " The question should test general knowledge or problem-solving ability."
 
         # Make the API call to OpenRouter
-        response = openai.ChatCompletion.create(
-            model="openai/gpt-3.5-turbo",  # Ensure you're using a valid model name for OpenRouter
-            messages=[
+        response = await get_client(PROVIDER).chat(
+            [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message}
             ],
+            model=MODEL,
             temperature=0.7
         )
-        return response.choices[0].message['content']
+        return response.content
     
     except Exception as e:
         return f"An error occurred: {e}"
 
-# Example inputs (in a real-world scenario, these would come from the frontend)
-scenario = {
-    "skills": "Python, Machine Learning, Data Structures",
-    "job_role": "Data Scientist",
-    "category": "technical",  # This could be 'behavioral', 'general', or 'technical'
-    "disability_type": "None",  # Example: 'None', 'Visual Impairment', etc.
-    "location": "New York",
-    "salary": "100000"
-}
-
-# Generate and print the interview question for the specified category
-print(generate_question(
-    skills=scenario["skills"],
-    job_role=scenario["job_role"],
-    category=scenario["category"],
-    disability_type=scenario["disability_type"],
-    location=scenario["location"],
-    salary=scenario["salary"]
-))
+def generate_question(skills, job_role, category, disability_type, location, salary):
+    return run_sync(generate_question_async(skills, job_role, category, disability_type, location, salary))
+
+def render_template(category, profile):
+    # Fields a template asks for but the profile lacks read as "not specified"
+    fields = defaultdict(lambda: "not specified", {k: v for k, v in profile.items() if v})
+    fields.setdefault("job_type", profile.get("job_role") or "not specified")
+    fields.setdefault("disability", profile.get("disability_type") or "not specified")
+    return TEMPLATES[category].format_map(fields)
+
+# Single-question output instructions ("Return only the behavioral question."); a set is returned as JSON instead
+SINGLE_ANSWER_LINE = re.compile(r"^\s*(please\s+)?return only\b.*$", re.IGNORECASE | re.MULTILINE)
+
+def render_set_instructions(category, profile):
+    # A template as instructions for each question of a set, without its single-answer output line
+    return SINGLE_ANSWER_LINE.sub("", render_template(category, profile)).strip()
+
+def split_counts(counts, limit=MAX_QUESTIONS_PER_PROMPT):
+    # [{"technical": 3, ...}, ...] with at most `limit` questions per chunk
+    chunks, current, size = [], {}, 0
+    for category, count in counts.items():
+        while count > 0:
+            take = min(count, limit - size)
+            current[category] = current.get(category, 0) + take
+            size += take
+            count -= take
+            if size == limit:
+                chunks.append(current)
+                current, size = {}, 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+def build_set_prompt(profile, counts):
+    sections = [
+        f"### {category} ({count} question{'s' if count > 1 else ''})\n{render_set_instructions(category, profile)}"
+        for category, count in counts.items()
+    ]
+    keys = ", ".join(f'"{category}"' for category in counts)
+
+    def field(name):
+        return profile.get(name) or "not specified"
+
+    return (
+        "Write interview questions for the candidate below. The instructions under each category describe "
+        "one question; apply them to every question requested for that category, and make the questions distinct.\n\n"
+        f"Candidate: job role {field('job_role')}, skills {field('skills')}, "
+        f"disability {field('disability_type')}, location {field('location')}, "
+        f"expected salary {field('salary')}.\n\n"
+        + "\n\n".join(sections)
+        + f"\n\nRespond with only a JSON object with the keys {keys}, each mapping to a list of question strings "
+        "with exactly the number of questions requested for that category."
+    )
+
+def parse_question_set(content, counts):
+    # JSON object as requested; tolerate code fences or text around it
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else {}
+    except ValueError:
+        data = {}
+    questions = {}
+    if not isinstance(data, dict):
+        data = {}
+    for category, count in counts.items():
+        items = data.get(category) or []
+        # A lone question sometimes comes back as a string rather than a one-item list
+        if isinstance(items, str):
+            items = [items]
+        elif not isinstance(items, list):
+            items = []
+        questions[category] = [str(q).strip() for q in items if str(q).strip()][:count]
+    return questions
+
+async def _generate_chunk(profile, counts):
+    response = await get_client(PROVIDER).chat(
+        [
+            {"role": "system", "content": "You are a helpful assistant for AI-based interview preparation."},
+            {"role": "user", "content": build_set_prompt(profile, counts)}
+        ],
+        model=MODEL,
+        temperature=0.7,
+        max_tokens=TOKENS_PER_QUESTION * sum(counts.values()) + 50
+    )
+    return parse_question_set(response.content, counts), response
+
+async def generate_question_set_async(profile, counts=None):
+    """Generate a whole mock interview for a profile, grouped by category.
+
+    profile holds skills, job_role, disability_type, location, salary and
+    optionally job_type and experience_level. counts maps category to how
+    many questions to ask (default 3 of each). Up to MAX_QUESTIONS_PER_PROMPT
+    questions go in one request; bigger sets are split and sent in parallel.
+    Returns {"questions", "usage", "latency", "requests"}.
+    """
+    counts = {c: n for c, n in (counts or {c: 3 for c in CATEGORIES}).items() if n > 0}
+    started = time.perf_counter()
+    chunks = split_counts(counts)
+    results = await asyncio.gather(*(_generate_chunk(profile, chunk) for chunk in chunks))
+
+    questions = {category: [] for category in counts}
+    usage = defaultdict(int)
+    for chunk_questions, response in results:
+        for category, items in chunk_questions.items():
+            questions[category].extend(items)
+        for key, value in response.usage.items():
+            if isinstance(value, int):
+                usage[key] += value
+
+    return {
+        "questions": questions,
+        "usage": dict(usage),
+        "latency": time.perf_counter() - started,
+        "requests": len(chunks)
+    }
+
+def generate_question_set(profile, counts=None):
+    return run_sync(generate_question_set_async(profile, counts))
+
+if __name__ == "__main__":
+    # Example inputs (in a real-world scenario, these would come from the frontend)
+    scenario = {
+        "skills": "Python, Machine Learning, Data Structures",
+        "job_role": "Data Scientist",
+        "category": "technical",  # This could be 'behavioral', 'general', or 'technical'
+        "disability_type": "None",  # Example: 'None', 'Visual Impairment', etc.
+        "location": "New York",
+        "salary": "100000"
+    }
+
+    # Generate and print the interview question for the specified category
+    print(generate_question(
+        skills=scenario["skills"],
+        job_role=scenario["job_role"],
+        category=scenario["category"],
+        disability_type=scenario["disability_type"],
+        location=scenario["location"],
+        salary=scenario["salary"]
+    ))
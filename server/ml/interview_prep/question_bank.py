@@ -0,0 +1,178 @@
+import asyncio
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from generator import CATEGORIES, generate_question_set_async, run_sync
+
+BANK_PATH = os.getenv(
+    "QUESTION_BANK_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_bank.sqlite3")
+)
+CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "recommendation", "merged_job_dataset.csv"
+)
+
+# Cosine similarity between profile texts needed to reuse a banked question
+MIN_SIMILARITY = float(os.getenv("QUESTION_BANK_MIN_SIMILARITY", 0.6))
+
+
+def profile_text(job_role, skills):
+    if isinstance(skills, (list, tuple)):
+        skills = ", ".join(skills)
+    return f"{job_role or ''} {skills or ''}".strip().lower()
+
+
+class QuestionBank:
+    """Interview questions stored per (job role + skills, category) on SQLite.
+
+    Lookups vectorize the profile with TF-IDF and return banked questions
+    whose stored profile is a close enough neighbour. Vectors are kept per
+    distinct profile, not per question, so refitting after a write-back of a
+    new profile stays cheap.
+    """
+
+    def __init__(self, path=BANK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._vectorizer = None
+        self._matrix = None
+        self._profiles = {}
+        self._dirty = True
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                " id INTEGER PRIMARY KEY, profile TEXT NOT NULL, category TEXT NOT NULL, question TEXT NOT NULL,"
+                " created REAL NOT NULL, UNIQUE (profile, category, question))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def add(self, job_role, skills, category, questions):
+        text = profile_text(job_role, skills)
+        with self._lock, self._connect() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO questions (profile, category, question, created) VALUES (?, ?, ?, ?)",
+                [(text, category, q, time.time()) for q in questions],
+            )
+            if self._matrix is None:
+                self._dirty = True
+            else:
+                # Keep the loaded view in step; only an unseen profile changes the vectors
+                self._dirty = self._dirty or text not in self._profiles
+                banked = self._profiles.setdefault(text, [])
+                banked.extend((category, q) for q in questions if (category, q) not in banked)
+
+    def _refresh(self):
+        # Caller holds the lock
+        if self._matrix is None:
+            profiles = {}
+            with self._connect() as db:
+                for text, category, question in db.execute("SELECT profile, category, question FROM questions ORDER BY id"):
+                    profiles.setdefault(text, []).append((category, question))
+            self._profiles = profiles
+        if self._profiles:
+            self._vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+            self._matrix = self._vectorizer.fit_transform(list(self._profiles))
+        self._dirty = False
+
+    def lookup(self, job_role, skills, category, n, min_similarity=MIN_SIMILARITY):
+        """Up to n banked questions for the nearest stored profiles, best match first."""
+        with self._lock:
+            if self._dirty:
+                self._refresh()
+            if not self._profiles or n <= 0:
+                return []
+            banked, vectorizer, matrix = list(self._profiles.values()), self._vectorizer, self._matrix
+
+        # TF-IDF rows are L2-normalized, so the dot product is the cosine similarity
+        query = vectorizer.transform([profile_text(job_role, skills)])
+        similarity = (matrix @ query.T).toarray().ravel()
+        questions = []
+        for i in np.argsort(-similarity, kind="stable"):
+            if similarity[i] < min_similarity or len(questions) == n:
+                break
+            questions.extend(q for c, q in banked[i] if c == category and q not in questions)
+        return questions[:n]
+
+    def size(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+
+_bank = None
+
+
+def get_bank():
+    global _bank
+    if _bank is None:
+        _bank = QuestionBank()
+    return _bank
+
+
+async def get_question_set_async(profile, counts=None, bank=None):
+    """Like generate_question_set_async, but served from the bank when possible.
+
+    Only the categories the bank can't fill are generated, and what gets
+    generated is written back for the next similar profile.
+    """
+    bank = bank or get_bank()
+    counts = {c: n for c, n in (counts or {c: 3 for c in CATEGORIES}).items() if n > 0}
+    started = time.perf_counter()
+
+    questions, missing = {}, {}
+    for category, count in counts.items():
+        questions[category] = bank.lookup(profile.get("job_role"), profile.get("skills"), category, count)
+        if len(questions[category]) < count:
+            missing[category] = count - len(questions[category])
+    bank_hits = sum(len(q) for q in questions.values())
+
+    usage, requests = {}, 0
+    if missing:
+        generated = await generate_question_set_async(profile, missing)
+        usage, requests = generated["usage"], generated["requests"]
+        for category, items in generated["questions"].items():
+            bank.add(profile.get("job_role"), profile.get("skills"), category, items)
+            questions[category].extend(items)
+
+    return {
+        "questions": questions,
+        "usage": usage,
+        "latency": time.perf_counter() - started,
+        "requests": requests,
+        "bank_hits": bank_hits
+    }
+
+
+def get_question_set(profile, counts=None):
+    return run_sync(get_question_set_async(profile, counts))
+
+
+async def _build(profiles, per_category, bank):
+    counts = {category: per_category for category in CATEGORIES}
+
+    async def fill(profile):
+        generated = await generate_question_set_async(profile, counts)
+        for category, items in generated["questions"].items():
+            bank.add(profile["job_role"], profile["skills"], category, items)
+
+    await asyncio.gather(*(fill(p) for p in profiles))
+
+
+def build_bank(csv_path=CATALOG_PATH, per_category=5, bank=None):
+    """Bulk-generate questions offline for every distinct role and skill set in the catalog."""
+    bank = bank or get_bank()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        pairs = sorted({(row["Job Role"], row["Skills Required"]) for row in csv.DictReader(f)})
+    run_sync(_build([{"job_role": role, "skills": skills} for role, skills in pairs], per_category, bank))
+    return len(pairs)
+
+
+if __name__ == "__main__":
+    count = build_bank()
+    print(f"Generated questions for {count} catalog profiles; bank now holds {get_bank().size()} questions")
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+import httpx
+from dotenv import load_dotenv
+
+from metrics import REGISTRY
+
+load_dotenv()
+
+# Provider name -> (API key variable, base URL variable, default base URL)
+PROVIDERS = {
+    "openai": ("OPENAI_API_KEY", "OPENAI_BASE_URL", "https://api.openai.com/v1"),
+    "openrouter": ("API_KEY", "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+}
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 32))
+TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+BACKOFF = float(os.getenv("LLM_BACKOFF", 0.5))
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+ChatResult = namedtuple("ChatResult", ["content", "usage", "latency"])
+
+
+class LLMError(Exception):
+    pass
+
+
+LLM_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds", "LLM call latency including retries", ("model", "outcome")
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "llm_time_to_first_token_seconds", "Time to the first streamed content delta", ("model",)
+)
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Tokens reported by the LLM API", ("model", "kind"))
+LLM_RETRIES = REGISTRY.counter("llm_retries_total", "Retried LLM attempts", ("model", "reason"))
+
+
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _parse_duration(value):
+    # "2", "1.5s", "6m0s", "20ms" -> seconds
+    try:
+        return float(value)
+    except ValueError:
+        parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+        return sum(float(n) * DURATION_UNITS[unit] for n, unit in parts) if parts else None
+
+
+def _retry_after(response):
+    # Seconds the server asked us to wait, from Retry-After or the OpenAI reset headers
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        value = response.headers.get(header)
+        seconds = _parse_duration(value) if value else None
+        if seconds is not None:
+            return seconds
+    return None
+
+
+class LLMClient:
+    """Async client for OpenAI-compatible chat completion APIs.
+
+    One pooled HTTP connection set per client, at most max_concurrency calls
+    in flight, a timeout per call, and retries with exponential backoff on
+    timeouts, 429s and 5xx. A 429 pauses every call on the client until the
+    server's reset time, instead of each caller hammering it independently.
+    """
+
+    def __init__(self, api_key, base_url, max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._http = None
+        self._semaphore = None
+        self._paused_until = 0.0
+
+    def _session(self):
+        # Created lazily so the client binds to the loop that first uses it
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def _wait_for_rate_limit(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def chat(self, messages, model, timeout=None, **params):
+        """Run one chat completion and return a ChatResult.
+
+        Extra keyword arguments (temperature, max_tokens, ...) are passed
+        through in the request body.
+        """
+        if not self.api_key:
+            raise LLMError("No API key configured for the LLM client")
+        http = self._session()
+        body = {"model": model, "messages": messages, **params}
+        timeout = self.timeout if timeout is None else timeout
+        call_started = time.perf_counter()
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_rate_limit()
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await http.post("/chat/completions", json=body, timeout=timeout)
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    error, wait = e, None
+                else:
+                    if response.status_code == 200:
+                        data = response.json()
+                        usage = data.get("usage", {})
+                        LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="ok")
+                        for kind in ("prompt_tokens", "completion_tokens"):
+                            LLM_TOKENS.inc(usage.get(kind, 0), model=model, kind=kind)
+                        return ChatResult(
+                            content=data["choices"][0]["message"]["content"],
+                            usage=usage,
+                            latency=time.perf_counter() - started,
+                        )
+                    if response.status_code not in RETRY_STATUSES:
+                        LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="error")
+                        raise LLMError(f"LLM request failed with {response.status_code}: {response.text[:200]}")
+                    error, wait = LLMError(f"LLM request failed with {response.status_code}"), _retry_after(response)
+                    if response.status_code == 429:
+                        self._paused_until = max(self._paused_until, time.monotonic() + (wait or self.backoff))
+
+            if attempt == self.max_retries:
+                LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="error")
+                raise LLMError(f"LLM request failed after {attempt + 1} attempts: {error}") from error
+            LLM_RETRIES.inc(model=model, reason=type(error).__name__)
+            # Exponential backoff with jitter, never shorter than what the server asked for
+            await asyncio.sleep(max(wait or 0.0, self.backoff * 2 ** attempt * (1 + random.random())))
+
+    async def stream_chat(self, messages, model, timeout=None, **params):
+        """Run one chat completion with `stream: true`, yielding content deltas as they arrive.
+
+        Retries and rate-limit pauses apply until the response starts; once
+        text has been yielded a failure is raised instead of restarting.
+        The concurrency slot is held for the whole stream.
+        """
+        if not self.api_key:
+            raise LLMError("No API key configured for the LLM client")
+        http = self._session()
+        body = {"model": model, "messages": messages, **params, "stream": True}
+        timeout = self.timeout if timeout is None else timeout
+        streamed = False
+        call_started = time.perf_counter()
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_rate_limit()
+            async with self._semaphore:
+                try:
+                    async with http.stream("POST", "/chat/completions", json=body, timeout=timeout) as response:
+                        if response.status_code == 200:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                choices = json.loads(data).get("choices") or [{}]
+                                delta = choices[0].get("delta", {}).get("content")
+                                if delta:
+                                    if not streamed:
+                                        LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - call_started, model=model)
+                                    streamed = True
+                                    yield delta
+                            LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="ok")
+                            return
+                        await response.aread()
+                        if response.status_code not in RETRY_STATUSES:
+                            LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="error")
+                            raise LLMError(f"LLM request failed with {response.status_code}: {response.text[:200]}")
+                        error, wait = LLMError(f"LLM request failed with {response.status_code}"), _retry_after(response)
+                        if response.status_code == 429:
+                            self._paused_until = max(self._paused_until, time.monotonic() + (wait or self.backoff))
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    if streamed:
+                        LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="error")
+                        raise LLMError(f"LLM stream interrupted: {e}") from e
+                    error, wait = e, None
+
+            if attempt == self.max_retries:
+                LLM_SECONDS.observe(time.perf_counter() - call_started, model=model, outcome="error")
+                raise LLMError(f"LLM request failed after {attempt + 1} attempts: {error}") from error
+            LLM_RETRIES.inc(model=model, reason=type(error).__name__)
+            await asyncio.sleep(max(wait or 0.0, self.backoff * 2 ** attempt * (1 + random.random())))
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+# Event loop -> {provider: client}; connections and semaphores belong to one loop
+_clients = weakref.WeakKeyDictionary()
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def get_client(provider="openai"):
+    """Shared client per provider for the running event loop, configured from the environment.
+
+    Call from inside a coroutine.
+    """
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    if provider not in clients:
+        key_var, url_var, default_url = PROVIDERS[provider]
+        clients[provider] = LLMClient(os.getenv(key_var), os.getenv(url_var, default_url))
+    return clients[provider]
+
+
+def _background_loop():
+    # One event loop thread per process serves every synchronous caller
+    global _loop, _loop_pid
+    with _loop_lock:
+        # The loop thread does not survive fork; start a fresh one in the child
+        if _loop is None or _loop_pid != os.getpid():
+            _loop, _loop_pid = asyncio.new_event_loop(), os.getpid()
+            threading.Thread(target=_loop.run_forever, name="llm-client-loop", daemon=True).start()
+    return _loop
+
+
+def run_sync(coroutine):
+    """Run a coroutine on the shared client loop from synchronous code (e.g. a Flask view)."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _background_loop()).result()
+
+
+def iter_sync(async_iterable):
+    """Iterate an async generator from synchronous code, e.g. to feed a streamed Flask response."""
+    items = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in async_iterable:
+                items.put(item)
+        except BaseException as e:
+            items.put(e)
+        finally:
+            items.put(done)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), _background_loop())
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Stop the producer if the consumer went away early (e.g. the browser disconnected)
+        future.cancel()
@@ -0,0 +1,388 @@
+import glob
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+
+# Seconds; covers sub-millisecond index hits up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.005))
+
+# Shared by the worker processes of one server (see recommendation/gunicorn.conf.py); unset for a single process
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _add(a, b):
+    # Counter values are numbers; histogram values are [bucket counts, sum, count]
+    if isinstance(a, list):
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]]
+    return a + b
+
+
+def _merge_states(states):
+    # {metric name: [[label values, value], ...]} from several processes, summed per series
+    merged = {}
+    for state in states:
+        for name, series in state.items():
+            values = merged.setdefault(name, {})
+            for key, value in series:
+                key = tuple(key)
+                values[key] = _add(values[key], value) if key in values else value
+    return {name: [[list(key), value] for key, value in values.items()] for name, values in merged.items()}
+
+
+def _read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(path, state):
+    # Atomic, so readers never see half a file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def state(self):
+        with self._lock:
+            return [[list(key), value if not isinstance(value, list) else [list(value[0]), value[1], value[2]]]
+                    for key, value in self._values.items()]
+
+    def render(self, others=()):
+        # others: [label values, value] series from other processes, added to this one's
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in others:
+            key = tuple(key)
+            values[key] = _add(values[key], value) if key in values else value
+        for key, value in sorted(values.items(), key=lambda item: tuple(map(str, item[0]))):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_labels(self.label_names, key)} {value}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_labels(self.label_names + ('le',), key + (bound,))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_labels(self.label_names + ('le',), key + ('+Inf',))} {count}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Process-wide set of metrics, rendered in the Prometheus text format.
+
+    Collectors are callables run at scrape time that return
+    (name, help, type, [(labels dict, value), ...]) tuples, for values that
+    live elsewhere (cache statistics, catalog size).
+
+    With a directory, several worker processes share their counters and
+    histograms: each worker writes its own values to <pid>.json every
+    flush interval and a scrape on any worker adds up every file, so other
+    workers' numbers lag by at most one interval. Collectors stay local to
+    the worker that serves the scrape.
+    """
+
+    def __init__(self, directory=METRICS_DIR):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self.directory = directory
+        self._flusher = None
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, help, labels=()):
+        return self._get_or_create(Counter, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help, labels, buckets)
+
+    def register_collector(self, collect):
+        self._collectors.append(collect)
+
+    def state(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.state() for metric in metrics}
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def flush(self):
+        if self.directory:
+            _write_state(self._path(os.getpid()), self.state())
+
+    def start_flushing(self, interval=METRICS_FLUSH_INTERVAL):
+        # Call in each worker after fork; threads do not survive fork
+        if not self.directory or (self._flusher is not None and self._flusher.is_alive()):
+            return
+
+        def flush():
+            while True:
+                time.sleep(interval)
+                self.flush()
+
+        self._flusher = threading.Thread(target=flush, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def retire(self, pid):
+        """Fold an exited worker's values into retired.json, so totals survive worker restarts.
+
+        Called by the server's master process only, which makes it the single writer of that file.
+        """
+        path = self._path(pid)
+        if not self.directory or not os.path.exists(path):
+            return
+        retired = self._path("retired")
+        _write_state(retired, _merge_states([_read_state(retired), _read_state(path)]))
+        os.remove(path)
+
+    def _shared(self):
+        # Values written by every other process sharing the directory
+        if not self.directory:
+            return {}
+        own = self._path(os.getpid())
+        return _merge_states(_read_state(path) for path in glob.glob(os.path.join(self.directory, "*.json")) if path != own)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        shared = self._shared()
+        for metric in metrics:
+            lines.extend(metric.render(shared.get(metric.name, ())))
+        for collect in self._collectors:
+            for name, help, kind, samples in collect():
+                lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}"])
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Flask request latency", ("service", "endpoint", "method", "status")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds", "Time spent per stage of a request", ("service", "stage")
+)
+ERRORS = REGISTRY.counter("errors_total", "Requests that failed inside the service", ("service", "where"))
+CANDIDATES = REGISTRY.histogram(
+    "recommend_candidates", "Jobs per result bucket before pagination", ("service", "bucket"), SIZE_BUCKETS
+)
+
+
+@contextmanager
+def timed(service, stage):
+    """Time a block into stage_duration_seconds{service, stage}."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, service=service, stage=stage)
+
+
+class SamplingProfiler:
+    """Opt-in per-request sampling profiler.
+
+    While enabled, a sampler thread reads the request thread's stack every
+    `interval` seconds and the collapsed stacks are written as one
+    .folded file per request (flamegraph.pl / speedscope input). When
+    disabled the only cost per request is a flag check.
+
+    With a shared directory (METRICS_DIR) the on/off state is a flag file
+    there, so a toggle on one worker reaches every worker within a second.
+    """
+
+    def __init__(self, enabled=False, interval=PROFILE_INTERVAL, directory=PROFILE_DIR, shared_dir=METRICS_DIR):
+        self.default = enabled
+        self.interval = interval
+        self.directory = directory
+        self._flag = os.path.join(shared_dir, "profiler.enabled") if shared_dir else None
+        self._enabled = enabled
+        self._checked = 0.0
+
+    @property
+    def shared(self):
+        return self._flag is not None
+
+    @property
+    def enabled(self):
+        # Re-read the shared flag at most once a second
+        if self._flag is not None:
+            now = time.monotonic()
+            if now - self._checked >= 1:
+                self._enabled = os.path.exists(self._flag)
+                self._checked = now
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = bool(value)
+        if self._flag is None:
+            return
+        if value:
+            os.makedirs(os.path.dirname(self._flag), exist_ok=True)
+            open(self._flag, "w").close()
+        elif os.path.exists(self._flag):
+            os.remove(self._flag)
+        self._checked = time.monotonic()
+
+    def start(self):
+        stacks, stop, target = Tally(), threading.Event(), threading.get_ident()
+
+        def sample():
+            while not stop.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    stacks[";".join(reversed(stack))] += 1
+
+        thread = threading.Thread(target=sample, name="request-profiler", daemon=True)
+        thread.start()
+        return stacks, stop, thread
+
+    def stop(self, session, name):
+        stacks, stop, thread = session
+        stop.set()
+        thread.join()
+        if not stacks:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{os.getpid()}-{name}.folded")
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
+        return path
+
+
+profiler = SamplingProfiler(enabled=os.getenv("PROFILE_REQUESTS", "").lower() in ("1", "true", "yes"))
+
+
+def instrument(app, service):
+    """Request latency metrics, GET /metrics and the profiler toggle for a Flask app."""
+    # Imported here so non-Flask users of the metrics (llm_client) don't need Flask
+    from flask import Blueprint, Response, g, jsonify, request
+
+    @app.before_request
+    def _start_request():
+        g.metrics_started = time.perf_counter()
+        if profiler.enabled:
+            g.profile = profiler.start()
+
+    @app.after_request
+    def _finish_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started, service=service, endpoint=request.endpoint or "unmatched",
+                method=request.method, status=response.status_code
+            )
+        session = g.pop("profile", None)
+        if session is not None:
+            path = profiler.stop(session, (request.endpoint or "unmatched").replace(".", "_"))
+            if path:
+                response.headers["X-Profile-File"] = os.path.basename(path)
+        return response
+
+    bp = Blueprint("metrics", __name__)
+
+    @bp.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+    @bp.route('/admin/profiler', methods=['POST'])
+    def toggle_profiler():
+        # Disabled unless ADMIN_TOKEN is configured
+        token = os.getenv("ADMIN_TOKEN")
+        if not token or not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+            return jsonify({"error": "Forbidden"}), 403
+        data = request.get_json(silent=True) or {}
+        profiler.enabled = bool(data.get("enabled", not profiler.enabled))
+        # "shared": whether the toggle reaches every worker, or only this process (pid)
+        return jsonify({
+            "enabled": profiler.enabled, "directory": profiler.directory,
+            "shared": profiler.shared, "pid": os.getpid()
+        }), 200
+
+    app.register_blueprint(bp)
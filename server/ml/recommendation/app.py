@@ -1,98 +1,155 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+import os
+import sys
+import time
+
+from flask import Blueprint, Flask, request, jsonify
+
+from catalog import Catalog, catalog_blueprint, catalog_metrics
+from cities import normalize_city
+from filters import candidate_rows, parse_salary_ranges
+from pagination import Ranking, paginate_buckets
+from ranking_cache import RankingCache
+from scoring import overall_scores, overall_scores_batch
+from serialization import job_records, json_response
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from metrics import CANDIDATES, ERRORS, REGISTRY, instrument, timed
+
+SERVICE = "recommendation"
+
+# Profiles accepted per /recommend_jobs/batch request, so one request can't hold a worker indefinitely
+MAX_BATCH_PROFILES = int(os.getenv("MAX_BATCH_PROFILES", 500))
+
+# Live job catalog; its index is swapped atomically when the dataset is reloaded.
+# Loaded by create_app, so importing this module stays cheap.
+catalog = Catalog(load=False)
+REGISTRY.register_collector(catalog_metrics(catalog))
+
+# Rankings per normalized profile, so later pages skip rescoring
+ranking_cache = RankingCache(
+    maxsize=int(os.getenv("RANKING_CACHE_SIZE", 256)),
+    ttl=float(os.getenv("RANKING_CACHE_TTL", 600)),
+    max_bytes=int(os.getenv("RANKING_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    current_version=lambda: catalog.index.version
+)
+
+def ranking_cache_metrics():
+    stats = ranking_cache.stats()
+    return [
+        (f"ranking_cache_{name}_total", f"Ranking cache {name}", "counter", [({}, stats[name])])
+        for name in ("hits", "misses", "stale", "evictions")
+    ] + [
+        ("ranking_cache_entries", "Rankings currently cached", "gauge", [({}, stats["size"])]),
+        ("ranking_cache_bytes", "Bytes held by cached rankings", "gauge", [({}, stats["bytes"])])
+    ]
+
+REGISTRY.register_collector(ranking_cache_metrics)
+
+def normalize_profile(disability, skills, work_mode, location, salary=None):
+    # Ensure inputs are lists
+    disability_list = [str(d).strip().lower() for d in (disability if isinstance(disability, list) else [disability])]
+    skills_list = [str(s).strip().lower() for s in (skills if isinstance(skills, list) else [skills])]
+    work_mode_list = [str(wm).strip().lower() for wm in (work_mode if isinstance(work_mode, list) else [work_mode])]
+    # Location arrives as a list or a comma-separated string (server.js joins the list)
+    places = location if isinstance(location, list) else str(location).split(",")
+    cities = tuple(dict.fromkeys(c for c in (normalize_city(p) for p in places) if c))
+    return disability_list, set(skills_list), work_mode_list, cities, parse_salary_ranges(salary)
+
+def profile_key(profile):
+    disability_list, skills_set, work_mode_list, cities, salary_ranges = profile
+    return (
+        tuple(sorted(set(disability_list))), tuple(sorted(skills_set)), tuple(sorted(set(work_mode_list))),
+        tuple(sorted(cities)), salary_ranges
+    )
 
-app = Flask(__name__)
+def rank(index, profile):
+    # Prune to jobs within reach of the user's cities and salary first, then score only those
+    disability_list, skills_set, work_mode_list, cities, salary_ranges = profile
+    with timed(SERVICE, "prune"):
+        rows = candidate_rows(index, cities, salary_ranges)
+    return Ranking(overall_scores(index, disability_list, skills_set, work_mode_list, cities, rows), rows)
+
+def page_response(index, skills_set, pages, has_more, next_cursor):
+    # Pages arrive in ranking order; records are built column-wise (see serialization.py)
+    weights = index.skill_vector(skills_set)
+    return {
+        **{bucket: job_records(index, rows, weights) for bucket, rows in pages.items()},
+        "has_more": any(has_more.values()),
+        "has_more_by_bucket": has_more,
+        "next_cursor": next_cursor
+    }
+
+def recommend_jobs_with_courses(disability, skills, work_mode, location, page=1, per_page=5, cursor=None, salary=None):
+    try:
+        # Pin one index for the whole request, even if a reload swaps it meanwhile
+        index = catalog.index
+        with timed(SERVICE, "normalize"):
+            profile = normalize_profile(disability, skills, work_mode, location, salary)
+
+        # Score the candidate jobs from the precomputed index, or reuse this profile's cached ranking
+        with timed(SERVICE, "score"):
+            ranking = ranking_cache.get_or_compute(index.version, profile_key(profile), lambda: rank(index, profile))
+        for bucket, rows in ranking.buckets.items():
+            CANDIDATES.observe(len(rows), service=SERVICE, bucket=bucket)
+
+        # Pagination: slice each bucket of the ranking
+        with timed(SERVICE, "paginate"):
+            pages, has_more, next_cursor = ranking.page(page, per_page, cursor)
+        with timed(SERVICE, "serialize"):
+            return page_response(index, profile[1], pages, has_more, next_cursor)
 
-# Load dataset
-df = pd.read_csv("merged_job_dataset.csv")
+    except Exception as e:
+        ERRORS.inc(service=SERVICE, where="recommend_jobs_with_courses")
+        return {"error": str(e)}, 500
 
-# Course mapping
-course_mapping = {
-    "python": "Python Programming Course",
-    "data analysis": "Data Analysis with Python",
-    "cybersecurity": "Cybersecurity Fundamentals",
-    "customer support": "Customer Service Excellence",
-}
+def recommend_jobs_batch(profiles, per_page=5):
+    """First page of every bucket for many profiles in one pass.
 
-def recommend_jobs_with_courses(disability, skills, work_mode, location, page=1, per_page=5):
+    Scores are computed as a profiles x jobs matrix (see overall_scores_batch);
+    each profile's page is then picked with top-K selection among its
+    candidate jobs. next_cursor in each result continues that profile through
+    /recommend_jobs.
+    """
     try:
-        # Ensure inputs are lists
-        disability_list = [str(d).strip().lower() for d in (disability if isinstance(disability, list) else [disability])]
-        skills_list = [str(s).strip().lower() for s in (skills if isinstance(skills, list) else [skills])]
-        work_mode_list = [str(wm).strip().lower() for wm in (work_mode if isinstance(work_mode, list) else [work_mode])]
-        location = ", ".join(location).strip().lower() if isinstance(location, list) else str(location).strip().lower()
-
-        # Normalize dataset
-        for col in ["Disability", "Skills Required", "Work Mode", "Workplace Location"]:
-            df[col] = df[col].astype(str).str.lower().fillna("")
-
-        skills_set = set(skills_list)
-
-        def calculate_skill_match_score(job_skills_str):
-            if not job_skills_str:
-                return 0
-            job_skills = set(s.strip() for s in job_skills_str.split(","))
-            return len(job_skills.intersection(skills_set)) / max(len(job_skills), 1)
-
-        def calculate_location_match_score(job_location):
-            return 1.0 if location in job_location else 0.5 if job_location else 0
-
-        def calculate_overall_score(row):
-            skill_score = calculate_skill_match_score(row["Skills Required"])
-            location_score = calculate_location_match_score(row["Workplace Location"])
-            disability_match = any(d in row["Disability"] for d in disability_list)
-            work_mode_match = any(wm in row["Work Mode"] for wm in work_mode_list)
-
-            base_score = skill_score * 0.4 + location_score * 0.3
-            if disability_match:
-                base_score += 0.2
-            if work_mode_match:
-                base_score += 0.1
-
-            return base_score
-
-        df["overall_score"] = df.apply(calculate_overall_score, axis=1)
-        sorted_df = df.sort_values("overall_score", ascending=False)
-
-        def process_jobs(df):
-            jobs = []
-            for _, row in df.iterrows():
-                job_skills = set(row["Skills Required"].split(",")) if row["Skills Required"] else set()
-                matched_skills = job_skills.intersection(skills_set)
-                missing_skills = job_skills - matched_skills
-                recommended_courses = [course_mapping.get(skill, f"Course for {skill}") for skill in missing_skills]
-
-                jobs.append({
-                    "Job Role": row["Job Role"],
-                    "Skills Required": row["Skills Required"],
-                    "Matched Skills": ", ".join(matched_skills) if matched_skills else "None",
-                    "Missing Skills": ", ".join(missing_skills) if missing_skills else "None",
-                    "Recommended Courses": ", ".join(recommended_courses) if recommended_courses else "No courses needed",
-                    "Salary (INR)": row["Salary (INR)"],
-                    "Workplace Location": row["Workplace Location"],
-                    "match_score": row["overall_score"]
-                })
-            return sorted(jobs, key=lambda x: x.pop("match_score"), reverse=True)
-
-        # Pagination
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-
-        highly_matched_df = sorted_df[sorted_df["overall_score"] > 0.7].iloc[start_idx:end_idx]
-        jobs_after_courses_df = sorted_df[(sorted_df["overall_score"] <= 0.7) & (sorted_df["overall_score"] > 0.4)].iloc[start_idx:end_idx]
-        suggested_jobs_df = sorted_df[sorted_df["overall_score"] <= 0.4].iloc[start_idx:end_idx]
-
+        started = time.perf_counter()
+        index = catalog.index
+        normalized = [
+            normalize_profile(
+                p.get("disability", []), p.get("skills", []), p.get("work_mode", []), p.get("location", ""), p.get("salary")
+            )
+            for p in profiles
+        ]
+
+        results = []
+        for offset, scores in overall_scores_batch(index, normalized):
+            for i, row_scores in enumerate(scores):
+                profile = normalized[offset + i]
+                rows = candidate_rows(index, profile[3], profile[4])
+                if rows is not None:
+                    row_scores = row_scores[rows]
+                pages, has_more, next_cursor = paginate_buckets(row_scores, 1, per_page, rows=rows)
+                results.append(page_response(index, profile[1], pages, has_more, next_cursor))
+
+        elapsed = time.perf_counter() - started
         return {
-            "highly_matched": process_jobs(highly_matched_df),
-            "jobs_after_courses": process_jobs(jobs_after_courses_df),
-            "suggested_jobs": process_jobs(suggested_jobs_df),
-            "has_more": len(sorted_df) > end_idx
+            "results": results,
+            "profiles": len(results),
+            "seconds": elapsed,
+            "profiles_per_second": len(results) / elapsed if elapsed > 0 else None
         }
 
     except Exception as e:
+        ERRORS.inc(service=SERVICE, where="recommend_jobs_batch")
         return {"error": str(e)}, 500
 
-@app.route('/recommend_jobs', methods=['POST'])
+routes = Blueprint("recommendation", __name__)
+
+@routes.before_request
+def require_catalog():
+    if not catalog.ready:
+        return jsonify({"error": "Job catalog is still loading"}), 503
+
+@routes.route('/recommend_jobs', methods=['POST'])
 def recommend_jobs():
     data = request.get_json()
     page = int(data.get("page", 1))
@@ -104,9 +161,49 @@ def recommend_jobs():
         data.get("work_mode", []),
         data.get("location", ""),
         page,
-        per_page
+        per_page,
+        data.get("cursor"),
+        data.get("salary")
     )
-    return jsonify(recommendations), 200
+    return json_response(recommendations)
+
+@routes.route('/recommend_jobs/batch', methods=['POST'])
+def recommend_jobs_batch_route():
+    data = request.get_json()
+    per_page = int(data.get("per_page", 5))
+    profiles = data.get("profiles", [])
+    if not isinstance(profiles, list):
+        return jsonify({"error": "profiles must be a list"}), 400
+    if len(profiles) > MAX_BATCH_PROFILES:
+        return jsonify({"error": f"At most {MAX_BATCH_PROFILES} profiles per batch"}), 400
+
+    recommendations = recommend_jobs_batch(profiles, per_page)
+    return json_response(recommendations)
+
+@routes.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    # The cache is per worker process; pid says which one answered
+    return jsonify({**ranking_cache.stats(), "pid": os.getpid()}), 200
+
+def create_app(wait_for_catalog=False, watch=True):
+    """Build the Flask app and start loading the catalog.
+
+    gunicorn (see gunicorn.conf.py) calls this in the master with
+    wait_for_catalog=True so the index is built once before workers fork, and
+    starts the file watcher per worker, since threads don't survive fork.
+    Otherwise the catalog loads in the background and /readyz turns green
+    when it is done.
+    """
+    app = Flask(__name__)
+    instrument(app, SERVICE)
+    app.register_blueprint(catalog_blueprint(catalog))
+    app.register_blueprint(routes)
+    if not catalog.ready:
+        catalog.reload(wait=wait_for_catalog)
+    if watch:
+        catalog.start_watching(float(os.getenv("CATALOG_POLL_INTERVAL", 0)))
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5002)
\ No newline at end of file
+    # Development server; use gunicorn -c gunicorn.conf.py in production
+    create_app().run(debug=True, port=5002)
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""Latency, throughput and memory benchmark for the two recommendation services.
+
+    python benchmark.py                                  # 2k, 100k and 1M rows, both implementations
+    python benchmark.py --sizes 2000 --requests 500 --output bench.json
+
+Each (catalog size, implementation) pair runs in its own process so peak RSS
+is per pair. Results are printed (and optionally written) as JSON.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+SIZES = (2000, 100000, 1000000)
+IMPLEMENTATIONS = ("app", "jobRecommendation")
+PER_PAGE = 5
+MAX_PAGE = 50
+
+
+def make_profiles(index, count, seed=0):
+    """Request mix drawn from the catalog's own values.
+
+    Users pick 0-2 disabilities, 1-4 skills (a fifth of them with noisy
+    spelling), at most one work mode and location. Most requests are for
+    page 1; the rest go geometrically deep, up to MAX_PAGE.
+    """
+    rng = np.random.default_rng(seed)
+    disabilities = index.tokens["Disability"]
+    work_modes = index.tokens["Work Mode"]
+    locations = index.tokens["Workplace Location"]
+
+    def pick(values, low, high):
+        return [str(v) for v in rng.choice(values, size=min(rng.integers(low, high + 1), len(values)), replace=False)]
+
+    def noisy(skill):
+        roll = rng.random()
+        if roll < 0.1:
+            return skill.title()
+        if roll < 0.2:
+            return " " + skill.replace(" ", "")
+        return skill
+
+    profiles = []
+    for _ in range(count):
+        profiles.append({
+            "disability": pick(disabilities, 0, 2),
+            "skills": [noisy(s) for s in pick(index.skills, 1, 4)],
+            "work_mode": pick(work_modes, 0, 1),
+            "location": pick(locations, 0, 1),
+            "page": 1 if rng.random() < 0.6 else int(min(rng.geometric(0.2) + 1, MAX_PAGE)),
+        })
+    return profiles
+
+
+def _percentiles(latencies):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "p50": float(np.percentile(ms, 50)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+        "mean": float(ms.mean()),
+        "max": float(ms.max()),
+    }
+
+
+def run_one(implementation, catalog_path, requests, seed=0, warmup=20, concurrency=1):
+    """Benchmark one implementation in this process against the catalog at catalog_path."""
+    from job_index import JobIndex
+
+    module = importlib.import_module(implementation)
+    started = time.perf_counter()
+    module.catalog.index = JobIndex.from_csv(catalog_path)
+    build_seconds = time.perf_counter() - started
+    if hasattr(module, "ranking_cache"):
+        module.ranking_cache.clear()
+
+    def call(profile):
+        t = time.perf_counter()
+        result = module.recommend_jobs_with_courses(
+            profile["disability"], profile["skills"], profile["work_mode"], profile["location"],
+            profile["page"], PER_PAGE
+        )
+        # Both implementations report failures as an ({"error": ...}, 500) tuple
+        return time.perf_counter() - t, isinstance(result, tuple)
+
+    profiles = make_profiles(module.catalog.index, warmup + requests, seed)
+    for profile in profiles[:warmup]:
+        call(profile)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(call, profiles[warmup:]))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "implementation": implementation,
+        "rows": module.catalog.index.size,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(failed for _, failed in outcomes),
+        "latency_ms": _percentiles([latency for latency, _ in outcomes]),
+        "throughput_rps": requests / elapsed,
+        "index_build_seconds": build_seconds,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if hasattr(module, "ranking_cache"):
+        result["ranking_cache"] = module.ranking_cache.stats()
+    return result
+
+
+def catalog_for(rows, seed, workdir):
+    # Generated once per size and seed, then reused by every implementation
+    from synthetic_catalog import write_catalog
+
+    path = os.path.join(workdir, f"catalog_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_catalog(rows, path, seed)
+    return path
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.time(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated catalog sizes")
+    parser.add_argument("--implementations", default=",".join(IMPLEMENTATIONS))
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per run")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "recommendation-benchmark"),
+                        help="where generated catalogs are kept between runs")
+    parser.add_argument("--output", help="also write the JSON report here")
+    # Internal: run a single pair in this process and print its JSON result
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--catalog", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_one(args.run, args.catalog, args.requests, args.seed, args.warmup, args.concurrency)))
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for rows in (int(size) for size in args.sizes.split(",")):
+        path = catalog_for(rows, args.seed, args.workdir)
+        for implementation in args.implementations.split(","):
+            command = [
+                sys.executable, os.path.abspath(__file__), "--run", implementation, "--catalog", path,
+                "--requests", str(args.requests), "--warmup", str(args.warmup),
+                "--concurrency", str(args.concurrency), "--seed", str(args.seed),
+            ]
+            completed = subprocess.run(command, cwd=HERE, capture_output=True, text=True)
+            if completed.returncode != 0:
+                results.append({"implementation": implementation, "rows": rows, "failed": completed.stderr[-2000:]})
+                continue
+            # The services print to stdout too; the result is the last line
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+            print(f"{implementation} @ {rows} rows: p50 {results[-1]['latency_ms']['p50']:.1f} ms", file=sys.stderr)
+
+    report = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import hmac
+import os
+import threading
+import time
+
+from flask import Blueprint, jsonify, request
+
+from job_index import DATASET_PATH
+from snapshot import SNAPSHOT_DIR, load_index
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+
+
+class Catalog:
+    """Holds the live JobIndex and swaps in rebuilt ones without downtime.
+
+    Readers take `catalog.index` once per request and keep using that object,
+    so in-flight requests finish on the snapshot they started with. A reload
+    builds the new index on a background thread and replaces the reference in
+    a single assignment.
+
+    With load=False nothing is read until the first reload(); `index` is
+    None and `ready` is False until then.
+
+    Under gunicorn the master owns reloads (see gunicorn.conf.py): workers
+    get reload_in_parent, and reload() just asks the master, which rebuilds
+    the index once and replaces the workers.
+    """
+
+    def __init__(self, csv_path=DATASET_PATH, snapshot_dir=SNAPSHOT_DIR, load=True):
+        self.csv_path = csv_path
+        self.snapshot_dir = snapshot_dir
+        self.reloads = 0
+        self.last_error = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self.reload_in_parent = None
+        self.index = None
+        self._signature = None
+        self.last_reload_seconds = None
+        self.loaded_at = None
+
+        if load:
+            started = time.perf_counter()
+            self._signature = _file_signature(csv_path)
+            self.index = load_index(csv_path, snapshot_dir)
+            self.last_reload_seconds = time.perf_counter() - started
+            self.loaded_at = time.time()
+
+    @property
+    def reloading(self):
+        return self._reload_lock.locked()
+
+    @property
+    def ready(self):
+        return self.index is not None
+
+    def reload(self, wait=False):
+        # Returns False if a reload is already running
+        if self.reload_in_parent is not None:
+            self.reload_in_parent()
+            return True
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        thread = threading.Thread(target=self._reload, name="catalog-reload", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def _reload(self):
+        try:
+            started = time.perf_counter()
+            # Record the file state first so a broken file isn't retried until it changes again
+            self._signature = _file_signature(self.csv_path)
+            index = load_index(self.csv_path, self.snapshot_dir)
+            if self.index is None or index.version != self.index.version:
+                self.index = index
+                self.reloads += 1
+            self.last_reload_seconds = time.perf_counter() - started
+            self.loaded_at = time.time()
+            self.last_error = None
+        except Exception as e:
+            # Keep serving the current index if the new catalog can't be loaded
+            self.last_error = str(e)
+            print(f"Catalog reload failed: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def start_watching(self, interval, on_change=None):
+        """Poll the dataset file every `interval` seconds and reload when it changes.
+
+        on_change replaces the reload, e.g. to signal a gunicorn master. Call
+        this in the process that owns the index; threads do not survive fork.
+        """
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval, on_change), name="catalog-watch", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, interval, on_change):
+        while True:
+            time.sleep(interval)
+            if _file_signature(self.csv_path) != self._signature:
+                if on_change is not None:
+                    on_change()
+                else:
+                    self.reload(wait=True)
+
+    def status(self):
+        index = self.index
+        return {
+            "ready": index is not None,
+            "version": index.version if index is not None else None,
+            "jobs": index.size if index is not None else 0,
+            "loaded_at": self.loaded_at,
+            "last_reload_seconds": self.last_reload_seconds,
+            "reloads": self.reloads,
+            "reloading": self.reloading,
+            "last_error": self.last_error,
+            # Per process: under gunicorn each worker answers for itself
+            "pid": os.getpid(),
+        }
+
+
+def catalog_blueprint(catalog):
+    # Catalog status, reload and health endpoints shared by both recommendation services
+    bp = Blueprint("catalog", __name__)
+
+    @bp.route('/catalog', methods=['GET'])
+    def catalog_status():
+        return jsonify(catalog.status()), 200
+
+    @bp.route('/admin/reload_catalog', methods=['POST'])
+    def reload_catalog():
+        # Disabled unless ADMIN_TOKEN is configured
+        token = os.getenv("ADMIN_TOKEN")
+        if not token or not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+            return jsonify({"error": "Forbidden"}), 403
+
+        data = request.get_json(silent=True) or {}
+        started = catalog.reload(wait=bool(data.get("wait", False)))
+        if not started:
+            return jsonify({"error": "Reload already in progress", **catalog.status()}), 409
+        return jsonify(catalog.status()), 202
+
+    @bp.route('/healthz', methods=['GET'])
+    def healthz():
+        # Liveness: the process is serving requests
+        return jsonify({"status": "ok"}), 200
+
+    @bp.route('/readyz', methods=['GET'])
+    def readyz():
+        # Readiness: only once the job index is built, so load balancers hold traffic until then
+        if not catalog.ready:
+            return jsonify({"status": "loading", "last_error": catalog.last_error}), 503
+        return jsonify({"status": "ready", "version": catalog.index.version, "jobs": catalog.index.size}), 200
+
+    return bp
+
+
+def catalog_metrics(catalog):
+    # Scrape-time collector for metrics.REGISTRY.register_collector
+    def collect():
+        status = catalog.status()
+        return [
+            ("catalog_ready", "1 once the job index is built", "gauge", [({}, int(status["ready"]))]),
+            ("catalog_jobs", "Jobs in the live catalog", "gauge", [({}, status["jobs"])]),
+            ("catalog_reloads_total", "Catalog reloads that swapped in a new index", "counter", [({}, status["reloads"])]),
+            ("catalog_last_reload_seconds", "Duration of the last catalog load", "gauge", [({}, status["last_reload_seconds"] or 0)]),
+        ]
+    return collect
@@ -0,0 +1,119 @@
+import math
+import os
+
+# Jobs within this distance of a user's city are offered as nearby
+NEARBY_KM = float(os.getenv("NEARBY_CITY_KM", 150))
+
+# (latitude, longitude) of the cities the onboarding flow offers and the catalog uses
+CITY_COORDINATES = {
+    "agra": (27.18, 78.01),
+    "ahmedabad": (23.02, 72.57),
+    "amritsar": (31.63, 74.87),
+    "andaman and nicobar islands": (11.62, 92.73),
+    "aurangabad": (19.88, 75.34),
+    "bangalore": (12.97, 77.59),
+    "bhopal": (23.26, 77.41),
+    "chandigarh": (30.73, 76.78),
+    "chennai": (13.08, 80.27),
+    "dehradun": (30.32, 78.03),
+    "delhi": (28.61, 77.21),
+    "dhanbad": (23.80, 86.43),
+    "faridabad": (28.41, 77.32),
+    "ghaziabad": (28.67, 77.45),
+    "gurugram": (28.46, 77.03),
+    "guwahati": (26.14, 91.74),
+    "hyderabad": (17.39, 78.49),
+    "indore": (22.72, 75.86),
+    "jaipur": (26.91, 75.79),
+    "jammu and kashmir": (34.08, 74.80),
+    "jodhpur": (26.24, 73.02),
+    "kanpur": (26.45, 80.33),
+    "kochi": (9.93, 76.27),
+    "kolkata": (22.57, 88.36),
+    "kota": (25.21, 75.86),
+    "ladakh": (34.15, 77.58),
+    "lucknow": (26.85, 80.95),
+    "ludhiana": (30.90, 75.86),
+    "mangalore": (12.91, 74.86),
+    "meerut": (28.98, 77.71),
+    "mumbai": (19.08, 72.88),
+    "mysore": (12.30, 76.64),
+    "nagpur": (21.15, 79.09),
+    "nashik": (20.00, 73.79),
+    "navi mumbai": (19.03, 73.03),
+    "noida": (28.54, 77.39),
+    "patna": (25.59, 85.14),
+    "puducherry": (11.94, 79.81),
+    "pune": (18.52, 73.86),
+    "raipur": (21.25, 81.63),
+    "rajkot": (22.30, 70.80),
+    "srinagar": (34.08, 74.80),
+    "surat": (21.17, 72.83),
+    "thane": (19.22, 72.98),
+    "vadodara": (22.31, 73.18),
+    "varanasi": (25.32, 82.97),
+    "visakhapatnam": (17.69, 83.22),
+}
+
+# Other spellings and former names -> the name used above
+CITY_ALIASES = {
+    "bengaluru": "bangalore",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "new delhi": "delhi",
+    "delhi ncr": "delhi",
+    "gurgaon": "gurugram",
+    "poona": "pune",
+    "mysuru": "mysore",
+    "mangaluru": "mangalore",
+    "vizag": "visakhapatnam",
+    "cochin": "kochi",
+    "pondicherry": "puducherry",
+    "baroda": "vadodara",
+    "benares": "varanasi",
+    "banaras": "varanasi",
+}
+
+
+def normalize_city(name):
+    name = " ".join(str(name).lower().replace(".", " ").split())
+    return CITY_ALIASES.get(name, name)
+
+
+def city_spellings(city):
+    # The city plus every alias for it, for matching catalog text that uses another spelling
+    return (city,) + tuple(alias for alias, name in CITY_ALIASES.items() if name == city)
+
+
+def _distance_km(a, b):
+    # Haversine great-circle distance
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+
+_nearby = {}
+
+
+def nearby_cities(city, km=NEARBY_KM):
+    """Known cities within km of city, nearest first, excluding the city itself."""
+    key = (city, km)
+    if key not in _nearby:
+        origin = CITY_COORDINATES.get(city)
+        found = []
+        if origin is not None:
+            found = sorted(
+                (_distance_km(origin, point), other)
+                for other, point in CITY_COORDINATES.items()
+                if other != city
+            )
+        _nearby[key] = tuple(other for distance, other in found if distance <= km)
+    return _nearby[key]
+
+
+def expand_cities(cities, km=NEARBY_KM):
+    # The cities themselves plus everything nearby that isn't already listed
+    cities = tuple(cities)
+    nearby = [c for city in cities for c in nearby_cities(city, km) if c not in cities]
+    return cities, tuple(dict.fromkeys(nearby))
@@ -0,0 +1,72 @@
+import re
+
+import numpy as np
+
+from cities import city_spellings, expand_cities
+
+# Salary choices in the onboarding flow are in lakhs per annum
+LPA = 100000
+
+# Work mode of jobs that don't depend on where the user lives
+REMOTE = "remote"
+
+# "Below 2 LPA", "2 - 4 LPA", "Above 20 LPA"
+SALARY_LABEL = re.compile(r"^\s*(below|under|above|over)?\s*(\d+(?:\.\d+)?)\s*(?:-|to)?\s*(\d+(?:\.\d+)?)?\s*(?:lpa|lakhs?)?\s*$", re.I)
+
+
+def _salary_range(choice):
+    if isinstance(choice, dict):
+        low, high = choice.get("min"), choice.get("max")
+        return float(low) if low is not None else 0.0, float(high) if high is not None else np.inf
+    if isinstance(choice, (int, float)):
+        # A bare number is a minimum expected salary in INR
+        return float(choice), np.inf
+    match = SALARY_LABEL.match(str(choice))
+    if not match:
+        return None
+    bound, low, high = match.groups()
+    low = float(low) * LPA
+    if bound and bound.lower() in ("below", "under"):
+        return 0.0, low
+    if bound or high is None:
+        return low, np.inf
+    return low, float(high) * LPA
+
+
+def parse_salary_ranges(salary):
+    """(low, high) INR ranges from the user's salary choices; unreadable choices are ignored."""
+    if salary is None or salary == "":
+        return ()
+    choices = salary if isinstance(salary, list) else [salary]
+    ranges = (_salary_range(choice) for choice in choices)
+    return tuple(sorted(set(r for r in ranges if r is not None)))
+
+
+def location_terms(cities):
+    # Catalog spellings of the user's cities and of the cities near them
+    exact, nearby = expand_cities(cities)
+    return [s for city in exact for s in city_spellings(city)], [s for city in nearby for s in city_spellings(city)]
+
+
+def candidate_rows(index, cities, salary_ranges):
+    """Sorted job ids within reach of the user's cities and salary ranges, or None for every job.
+
+    Runs on the sorted indexes (location postings, salary binary search)
+    before anything is scored. Remote jobs are never pruned by location;
+    they are scored with the location term as before. A constraint that matches no job on its own
+    is dropped rather than emptying the results; when both match but don't
+    overlap, location wins, since it is also part of the score.
+    """
+    rows = None
+    if cities:
+        exact, nearby = location_terms(cities)
+        located = index.lookup("Workplace Location", exact + nearby)
+        if located.size:
+            rows = np.union1d(located, index.lookup("Work Mode", [REMOTE]))
+    if salary_ranges:
+        paid = index.salary_rows(salary_ranges)
+        if paid.size:
+            both = paid if rows is None else np.intersect1d(rows, paid, assume_unique=True)
+            if both.size:
+                rows = both
+    return rows
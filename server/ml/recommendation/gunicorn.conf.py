@@ -0,0 +1,114 @@
+# Production server for the recommendation services:
+#
+#     gunicorn -c gunicorn.conf.py
+#     RECOMMENDATION_APP=jobRecommendation gunicorn -c gunicorn.conf.py
+#
+# The app is preloaded: the master builds the job index once (from the .npy
+# snapshot when fresh) and forked workers share those pages copy-on-write
+# instead of each re-reading the CSV.
+#
+# The master also owns catalog reloads. It watches the CSV, and on a change
+# (or POST /admin/reload_catalog on any worker, or `kill -HUP <master>`) it
+# rebuilds the index and snapshot once in on_reload, then gunicorn replaces
+# the workers with fresh forks that share the new index.
+#
+# What stays per worker: the ranking cache, so a cursor's next page served
+# by another worker is rescored there rather than read from the cache
+# (results are the same, only slower), and /cache_stats and /catalog, which
+# report the worker that answered (see "pid"). /metrics adds up counters and
+# histograms across workers through METRICS_DIR; other workers' values lag
+# by up to METRICS_FLUSH_INTERVAL seconds. POST /admin/profiler sets a flag
+# file there too, which every worker picks up within a second.
+import gc
+import glob
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+
+# One BLAS/OpenMP thread per worker; parallelism comes from the workers.
+# Must be set before numpy is imported by the app.
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+# Read by metrics.py when the app is imported, so set before that too
+os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "recommendation-metrics"))
+
+_module = os.getenv("RECOMMENDATION_APP", "app")
+
+wsgi_app = f"{_module}:create_app(wait_for_catalog=True, watch=False)"
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.getenv("BIND", "127.0.0.1:5002")
+preload_app = True
+
+# Scoring is CPU-bound and holds the GIL for much of a request, so scale with
+# processes: one worker per core. A second thread per worker overlaps response
+# writing and slow clients with the next request's scoring.
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.getenv("WORKER_THREADS", 2))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+keepalive = 5
+
+# Recycle workers now and then so fragmentation from large batches doesn't accumulate
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+
+
+def on_starting(server):
+    # Values left by a previous server would be added to this one's
+    os.makedirs(os.environ["METRICS_DIR"], exist_ok=True)
+    for path in glob.glob(os.path.join(os.environ["METRICS_DIR"], "*.json")):
+        os.remove(path)
+
+    # The profiler flag file is shared by all workers; start from PROFILE_REQUESTS, not a previous run's toggle
+    from metrics import profiler
+    profiler.enabled = profiler.default
+
+
+def when_ready(server):
+    # A changed CSV becomes a SIGHUP to ourselves, handled by on_reload below
+    sys.modules[_module].catalog.start_watching(
+        float(os.getenv("CATALOG_POLL_INTERVAL", 30)), on_change=lambda: os.kill(server.pid, signal.SIGHUP)
+    )
+
+
+def on_reload(server):
+    # Runs in the master before the replacement workers are forked
+    catalog = sys.modules[_module].catalog
+    catalog.reload(wait=True)
+    server.log.info("Catalog reloaded: %s", catalog.status())
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach, so GC passes
+    # in the workers don't write to (and un-share) the preloaded pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Reloads requested on a worker go to the master
+    module = sys.modules[_module]
+    module.catalog.reload_in_parent = lambda: os.kill(server.pid, signal.SIGHUP)
+
+    # Threads don't survive fork, so each worker starts its own metrics flusher
+    from metrics import REGISTRY
+    REGISTRY.start_flushing()
+
+    # Workers inherit the master's RNG state; reseed so random fallbacks differ
+    import numpy as np
+    np.random.seed()
+
+
+def worker_exit(server, worker):
+    # Last values of this worker, for child_exit to fold into the totals
+    from metrics import REGISTRY
+    REGISTRY.flush()
+
+
+def child_exit(server, worker):
+    from metrics import REGISTRY
+    REGISTRY.retire(worker.pid)
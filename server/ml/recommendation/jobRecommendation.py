@@ -1,182 +1,104 @@
-from flask import Flask, request, jsonify
-import pandas as pd
-import random
-
-app = Flask(__name__)
-
-# Load dataset
-df = pd.read_csv("merged_job_dataset.csv")
-
-# Example course mapping
-course_mapping = {
-    "python": "Python Programming Course",
-    "data analysis": "Data Analysis with Python",
-    "cybersecurity": "Cybersecurity Fundamentals",
-    "customer support": "Customer Service Excellence",
-}
-def recommend_jobs_with_courses(disability, skills, work_mode, location, page=1, per_page=5):
-    try:
-        # Ensure inputs are lists
-        disability_list = [d.strip().lower() for d in disability] if isinstance(disability, list) else []
-        skills_list = [s.strip().lower() for s in skills] if isinstance(skills, list) else []
-        work_mode_list = [wm.strip().lower() for wm in work_mode] if isinstance(work_mode, list) else []
-        location_list = [loc.strip().lower() for loc in location] if isinstance(location, list) else []
-
-        # Convert dataset columns to lowercase for filtering
-        df["Disability"] = df["Disability"].astype(str).str.lower().fillna("")
-        df["Skills Required"] = df["Skills Required"].astype(str).str.lower().fillna("")
-        df["Work Mode"] = df["Work Mode"].astype(str).str.lower().fillna("")
-        df["Workplace Location"] = df["Workplace Location"].astype(str).str.lower().fillna("")
-
-        # Step 1: Apply filtering based on disability, work mode, and location
-        filtered_df = df[
-            (df["Disability"].apply(lambda x: any(d in x for d in disability_list)) if disability_list else True) &
-            (df["Work Mode"].apply(lambda x: any(wm in x for wm in work_mode_list)) if work_mode_list else True) &
-            (df["Workplace Location"].apply(lambda x: any(loc in x for loc in location_list)) if location_list else True)
-        ]
-
-        # Step 2: If no strict match, relax filtering (OR conditions)
-        if filtered_df.empty:
-            filtered_df = df[
-                df["Disability"].apply(lambda x: any(d in x for d in disability_list)) |
-                df["Work Mode"].apply(lambda x: any(wm in x for wm in work_mode_list)) |
-                df["Workplace Location"].apply(lambda x: any(loc in x for loc in location_list))
-            ]
-
-        # Step 3: If still empty, fallback to skill-based matching
-        skills_set = set(skills_list)
-        if filtered_df.empty:
-            filtered_df = df[df["Skills Required"].apply(lambda x: any(skill in x for skill in skills_set))]
-
-        # Step 4: If still empty, return random jobs as a fallback
-        if filtered_df.empty:
-            filtered_df = df.sample(min(per_page, len(df)))
-
-        # Step 5: Define job matching logic
-        def calculate_match(job_skills, user_skills):
-            job_skills_set = set(job_skills.split(", ")) if job_skills else set()
-            matched_skills = job_skills_set.intersection(user_skills)
-            match_percentage = (len(matched_skills) / len(job_skills_set)) if job_skills_set else 0
-            return match_percentage
-
-        # Categorize jobs:
-        highly_matched_df = filtered_df[
-            filtered_df["Skills Required"].apply(lambda x: calculate_match(x, skills_set) >= 0.8)
-        ]
-        jobs_after_courses_df = filtered_df[
-            (filtered_df["Skills Required"].apply(lambda x: 0.5 <= calculate_match(x, skills_set) < 0.8))
-        ]
-        suggested_jobs_df = filtered_df[
-            (filtered_df["Skills Required"].apply(lambda x: calculate_match(x, skills_set) < 0.5))
-        ]
-
-        # Process jobs
-        def process_jobs(df):
-            jobs = []
-            for _, row in df.iterrows():
-                job_skills = set(row["Skills Required"].split(", ")) if row["Skills Required"] else set()
-                matched_skills = job_skills.intersection(skills_set)
-                missing_skills = job_skills - matched_skills
-                recommended_courses = [course_mapping.get(skill, f"Course for {skill}") for skill in missing_skills]
-
-                jobs.append({
-                    "Job Role": row["Job Role"],
-                    "Skills Required": row["Skills Required"],
-                    "Matched Skills": ", ".join(matched_skills) if matched_skills else "None",
-                    "Missing Skills": ", ".join(missing_skills) if missing_skills else "None",
-                    "Recommended Courses": ", ".join(recommended_courses) if recommended_courses else "No courses needed",
-                    "Salary (INR)": row["Salary (INR)"],
-                    "Workplace Location": row["Workplace Location"]
-                })
-            return jobs
+import os
+import sys
 
-        # Pagination
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
+from flask import Blueprint, Flask, request, jsonify
+import numpy as np
 
-        return {
-            "highly_matched": process_jobs(highly_matched_df.iloc[start_idx:end_idx]),
-            "jobs_after_courses": process_jobs(jobs_after_courses_df.iloc[start_idx:end_idx]),
-            "suggested_jobs": process_jobs(suggested_jobs_df.iloc[start_idx:end_idx]),
-            "has_more": len(filtered_df) > end_idx
-        }
+from catalog import Catalog, catalog_blueprint, catalog_metrics
+from cities import normalize_city
+from filters import location_terms, parse_salary_ranges
+from serialization import job_records, json_response
 
-    except Exception as e:
-        print(f"Error in job recommendation: {str(e)}")
-        return {"error": str(e)}, 500
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from metrics import CANDIDATES, ERRORS, REGISTRY, instrument, timed
+
+SERVICE = "job_recommendation"
 
+# Live job catalog; its index is swapped atomically when the dataset is reloaded.
+# Loaded by create_app, so importing this module stays cheap.
+catalog = Catalog(load=False)
+REGISTRY.register_collector(catalog_metrics(catalog))
+
+def recommend_jobs_with_courses(disability, skills, work_mode, location, page=1, per_page=5, salary=None):
     try:
+        # Pin one index for the whole request, even if a reload swaps it meanwhile
+        index = catalog.index
+
         # Ensure inputs are lists
-        disability_list = [d.strip().lower() for d in disability] if isinstance(disability, list) else []
-        skills_list = [s.strip().lower() for s in skills] if isinstance(skills, list) else []
-        work_mode_list = [wm.strip().lower() for wm in work_mode] if isinstance(work_mode, list) else []
-        location_list = [loc.strip().lower() for loc in location] if isinstance(location, list) else []
-
-        # Convert dataset columns to lowercase for filtering
-        df["Disability"] = df["Disability"].astype(str).str.lower().fillna("")
-        df["Skills Required"] = df["Skills Required"].astype(str).str.lower().fillna("")
-        df["Work Mode"] = df["Work Mode"].astype(str).str.lower().fillna("")
-        df["Workplace Location"] = df["Workplace Location"].astype(str).str.lower().fillna("")
-
-        # Step 1: Apply filtering based on disability, work mode, and location
-        filtered_df = df[
-            (df["Disability"].apply(lambda x: any(d in x for d in disability_list)) if disability_list else True) &
-            (df["Work Mode"].apply(lambda x: any(wm in x for wm in work_mode_list)) if work_mode_list else True) &
-            (df["Workplace Location"].apply(lambda x: any(loc in x for loc in location_list)) if location_list else True)
-        ]
-
-        # Step 2: If no strict match, relax filtering (OR conditions)
-        if filtered_df.empty:
-            filtered_df = df[
-                df["Disability"].apply(lambda x: any(d in x for d in disability_list)) |
-                df["Work Mode"].apply(lambda x: any(wm in x for wm in work_mode_list)) |
-                df["Workplace Location"].apply(lambda x: any(loc in x for loc in location_list))
-            ]
-
-        # Step 3: If still empty, fallback to skill-based matching
-        skills_set = set(skills_list)
-        if filtered_df.empty:
-            filtered_df = df[df["Skills Required"].apply(lambda x: any(skill in x for skill in skills_set))]
-
-        # Step 4: If still empty, return random jobs as a fallback
-        if filtered_df.empty:
-            filtered_df = df.sample(min(per_page, len(df)))
-
-        # Step 5: Process jobs (match skills, recommend courses)
-        def process_jobs(df):
-            jobs = []
-            for _, row in df.iterrows():
-                job_skills = set(row["Skills Required"].split(", ")) if row["Skills Required"] else set()
-                matched_skills = job_skills.intersection(skills_set)
-                missing_skills = job_skills - matched_skills
-                recommended_courses = [course_mapping.get(skill, f"Course for {skill}") for skill in missing_skills]
-
-                jobs.append({
-                    "Job Role": row["Job Role"],
-                    "Skills Required": row["Skills Required"],
-                    "Matched Skills": ", ".join(matched_skills) if matched_skills else "None",
-                    "Missing Skills": ", ".join(missing_skills) if missing_skills else "None",
-                    "Recommended Courses": ", ".join(recommended_courses) if recommended_courses else "No courses needed",
-                    "Salary (INR)": row["Salary (INR)"],
-                    "Workplace Location": row["Workplace Location"]
-                })
-            return jobs
+        with timed(SERVICE, "normalize"):
+            disability_list = [d.strip().lower() for d in disability] if isinstance(disability, list) else []
+            skills_list = [s.strip().lower() for s in skills] if isinstance(skills, list) else []
+            work_mode_list = [wm.strip().lower() for wm in work_mode] if isinstance(work_mode, list) else []
+            location_list = [normalize_city(loc) for loc in location] if isinstance(location, list) else []
+            location_list = [loc for loc in location_list if loc]
+            salary_ranges = parse_salary_ranges(salary)
+
+        # Step 1: Apply filtering based on disability, work mode, location (including nearby cities) and salary
+        # Each filter is a sorted posting list from the index's inverted indexes, or a binary search for salary
+        with timed(SERVICE, "filter"):
+            disability_jobs = index.lookup("Disability", disability_list)
+            work_mode_jobs = index.lookup("Work Mode", work_mode_list)
+            exact, nearby = location_terms(location_list)
+            location_jobs = index.lookup("Workplace Location", exact + nearby)
+            salary_jobs = index.salary_rows(salary_ranges)
+
+            candidates = np.arange(index.size)
+            for terms, jobs in ((disability_list, disability_jobs), (work_mode_list, work_mode_jobs),
+                                (location_list, location_jobs), (salary_ranges, salary_jobs)):
+                if terms:
+                    candidates = np.intersect1d(candidates, jobs, assume_unique=True)
+
+            # Step 2: If no strict match, relax filtering (OR conditions)
+            if candidates.size == 0:
+                candidates = np.union1d(np.union1d(disability_jobs, work_mode_jobs), np.union1d(location_jobs, salary_jobs))
+
+            # Step 3: If still empty, fallback to jobs whose skill set is similar to the user's
+            skills_set = set(skills_list)
+            if candidates.size == 0:
+                candidates = index.similar_jobs(skills_set)
+
+            # Step 4: If still empty, return random jobs as a fallback
+            if candidates.size == 0:
+                candidates = np.random.choice(index.size, min(per_page, index.size), replace=False)
+        CANDIDATES.observe(candidates.size, service=SERVICE, bucket="all")
+
+        # Step 5: Categorize jobs by skill match, scoring only the candidates
+        with timed(SERVICE, "score"):
+            match = index.skill_overlap(skills_set, candidates)
+            highly_matched = candidates[match >= 0.8]
+            jobs_after_courses = candidates[(match >= 0.5) & (match < 0.8)]
+            suggested_jobs = candidates[match < 0.5]
+        for bucket, rows in (("highly_matched", highly_matched), ("jobs_after_courses", jobs_after_courses), ("suggested_jobs", suggested_jobs)):
+            CANDIDATES.observe(rows.size, service=SERVICE, bucket=bucket)
+
+        # Matched/missing skills use the same weights as the overlap scores above
+        weights = index.skill_vector(skills_set)
 
         # Pagination
         start_idx = (page - 1) * per_page
         end_idx = start_idx + per_page
-        recommended_jobs = process_jobs(filtered_df.iloc[start_idx:end_idx])
 
-        return {
-            "recommendations": recommended_jobs,
-            "has_more": len(filtered_df) > end_idx
-        }
+        with timed(SERVICE, "serialize"):
+            return {
+                "highly_matched": job_records(index, highly_matched[start_idx:end_idx], weights),
+                "jobs_after_courses": job_records(index, jobs_after_courses[start_idx:end_idx], weights),
+                "suggested_jobs": job_records(index, suggested_jobs[start_idx:end_idx], weights),
+                "has_more": len(candidates) > end_idx
+            }
 
     except Exception as e:
+        ERRORS.inc(service=SERVICE, where="recommend_jobs_with_courses")
         print(f"Error in job recommendation: {str(e)}")
         return {"error": str(e)}, 500
 
-@app.route('/recommend_jobs', methods=['POST'])
+routes = Blueprint("job_recommendation", __name__)
+
+@routes.before_request
+def require_catalog():
+    if not catalog.ready:
+        return jsonify({"error": "Job catalog is still loading"}), 503
+
+@routes.route('/recommend_jobs', methods=['POST'])
 def recommend_jobs():
     try:
         if request.content_type != 'application/json':
@@ -195,13 +117,28 @@ def recommend_jobs():
             data.get("work_mode", []),
             data.get("location", []),  # Fix: Treat location as a list
             page,
-            per_page
+            per_page,
+            data.get("salary")
         )
 
-        return jsonify(recommendations), 200
+        return json_response(recommendations)
     except Exception as e:
+        ERRORS.inc(service=SERVICE, where="recommend_jobs")
         print(f"API Error: {str(e)}")
         return jsonify({"error": "Internal Server Error", "details": str(e)}), 500
 
+def create_app(wait_for_catalog=False, watch=True):
+    # Same contract as app.create_app; see gunicorn.conf.py
+    app = Flask(__name__)
+    instrument(app, SERVICE)
+    app.register_blueprint(catalog_blueprint(catalog))
+    app.register_blueprint(routes)
+    if not catalog.ready:
+        catalog.reload(wait=wait_for_catalog)
+    if watch:
+        catalog.start_watching(float(os.getenv("CATALOG_POLL_INTERVAL", 0)))
+    return app
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5002)
\ No newline at end of file
+    # Development server; use gunicorn -c gunicorn.conf.py in production
+    create_app().run(debug=True, port=5002)
\ No newline at end of file
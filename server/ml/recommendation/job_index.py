@@ -0,0 +1,240 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from skill_similarity import ANN_MIN_ITEMS, SET_SIMILARITY_THRESHOLD, SkillANN, SkillModel, skill_set_vectors
+from skill_vocabulary import DATASET_PATH, split_skills, vocabulary
+
+# Columns matched against user input; lowercased once when the index is built
+NORMALIZED_COLUMNS = ["Disability", "Skills Required", "Work Mode", "Workplace Location"]
+SALARY_COLUMN = "Salary (INR)"
+
+
+# Bound on memoized (column, term) lookups; user input makes the key space open-ended
+MAX_MEMOIZED_TERMS = 4096
+
+# Course suggested for a missing skill; other skills get a generic "Course for <skill>"
+COURSE_MAPPING = {
+    "python": "Python Programming Course",
+    "data analysis": "Data Analysis with Python",
+    "cybersecurity": "Cybersecurity Fundamentals",
+    "customer support": "Customer Service Excellence",
+}
+
+
+def _incidence(skill_sets, skill_ids):
+    # Sparse 0/1 matrix of skill sets x vocabulary
+    indptr = np.concatenate(([0], np.cumsum([len(s) for s in skill_sets]))).astype(np.int64)
+    indices = np.fromiter((skill_ids[s] for job in skill_sets for s in sorted(job)), dtype=np.int32, count=int(indptr[-1]))
+    return sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(skill_sets), len(skill_ids)))
+
+
+def dataset_version(path=DATASET_PATH):
+    # Content hash of the dataset file; changes whenever the catalog does
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+def _skill_courses(skills):
+    return tuple(COURSE_MAPPING.get(skill, f"Course for {skill}") for skill in skills)
+
+
+class JobIndex:
+    """Normalized, read-only view of the job catalog.
+
+    Built once when the dataset loads. Request handlers only read from it, so a
+    single instance can be shared by every thread of a worker.
+    """
+
+    def __init__(self, df, version=None):
+        self.version = version
+        self._category_hits = {}
+        frame = df.reset_index(drop=True)
+        for col in NORMALIZED_COLUMNS:
+            frame[col] = frame[col].fillna("").astype(str).str.lower()
+        self.frame = frame
+        self.size = len(frame)
+
+        # Pre-split skills per job
+        self.skill_sets = tuple(split_skills(s) for s in frame["Skills Required"])
+        self.skill_counts = _readonly(np.fromiter((len(s) for s in self.skill_sets), dtype=np.int64, count=self.size))
+
+        # Skill vocabulary and sparse job x skill incidence matrix
+        self.skills = vocabulary(self.skill_sets)
+        self.skill_ids = {skill: i for i, skill in enumerate(self.skills)}
+        self.skill_matrix = _incidence(self.skill_sets, self.skill_ids)
+        self.skill_courses = _skill_courses(self.skills)
+        self.skill_model = SkillModel(self.skills)
+        self._skill_set_search = None
+
+        self._sort_salaries()
+
+        # Categorical codes: per-row code into a small table of distinct values
+        self.codes = {}
+        self.categories = {}
+        for col in NORMALIZED_COLUMNS:
+            codes, uniques = pd.factorize(frame[col])
+            self.codes[col] = _readonly(codes.astype(np.int32))
+            self.categories[col] = tuple(uniques)
+
+        # Inverted indexes: comma-separated token -> sorted array of job ids
+        self.tokens = {}
+        self.postings = {}
+        for col in NORMALIZED_COLUMNS:
+            self.tokens[col], self.postings[col] = self._invert(self.codes[col], self.categories[col])
+
+    @staticmethod
+    def _invert(codes, categories):
+        # Group rows by category code once (ascending within each group), then
+        # merge the groups of every category a token appears in
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(categories)))))
+        token_codes = {}
+        for code, value in enumerate(categories):
+            for token in split_skills(value):
+                token_codes.setdefault(token, []).append(code)
+        tokens = tuple(sorted(token_codes))
+        postings = tuple(
+            _readonly(np.sort(np.concatenate([order[bounds[c]:bounds[c + 1]] for c in token_codes[token]])))
+            for token in tokens
+        )
+        return tokens, postings
+
+    @classmethod
+    def restore(cls, frame, version, skill_matrix, codes, categories, tokens, postings):
+        # Reassemble an index from previously derived parts (see snapshot.py)
+        index = cls.__new__(cls)
+        index.version = version
+        index._category_hits = {}
+        index.frame = frame
+        index.size = len(frame)
+        index.codes = codes
+        index.categories = categories
+        index.tokens = tokens
+        index.postings = postings
+        index.skill_matrix = skill_matrix
+        index.skill_counts = _readonly(np.diff(skill_matrix.indptr).astype(np.int64))
+        index.skills = tokens["Skills Required"]
+        index.skill_ids = {skill: i for i, skill in enumerate(index.skills)}
+        category_sets = [split_skills(value) for value in categories["Skills Required"]]
+        index.skill_sets = tuple(category_sets[c] for c in codes["Skills Required"])
+        index.skill_courses = _skill_courses(index.skills)
+        index.skill_model = SkillModel(index.skills)
+        index._skill_set_search = None
+        index._sort_salaries()
+        return index
+
+    def _sort_salaries(self):
+        # Salaries in ascending order plus the job id of each, for range queries by binary search
+        salaries = np.asarray(pd.to_numeric(self.frame[SALARY_COLUMN], errors="coerce"), dtype=float) \
+            if SALARY_COLUMN in self.frame else np.full(self.size, np.nan)
+        self.salary_order = _readonly(np.argsort(salaries, kind="stable"))
+        self.salary_sorted = _readonly(salaries[self.salary_order])
+
+    @classmethod
+    def from_csv(cls, path=DATASET_PATH):
+        return cls(pd.read_csv(path), version=dataset_version(path))
+
+    def category_hits(self, column, term):
+        # Which distinct values of column contain term; memoized, since terms repeat across requests
+        key = (column, term)
+        hits = self._category_hits.get(key)
+        if hits is None:
+            if len(self._category_hits) >= MAX_MEMOIZED_TERMS:
+                self._category_hits.clear()
+            hits = _readonly(np.array([term in v for v in self.categories[column]], dtype=bool))
+            self._category_hits[key] = hits
+        return hits
+
+    def category_hits_any(self, column, terms):
+        hits = np.zeros(len(self.categories[column]), dtype=bool)
+        for term in terms:
+            hits |= self.category_hits(column, term)
+        return hits
+
+    def contains_any(self, column, terms):
+        # Row mask: does the column value contain any of the terms as a substring?
+        return self.category_hits_any(column, terms)[self.codes[column]]
+
+    def lookup(self, column, terms):
+        """Sorted job ids whose column value contains any of the terms as a substring.
+
+        A stripped term without a comma can only match inside one token,
+        so it resolves to the union of the postings of the tokens containing
+        it. Terms spanning a separator fall back to the distinct values.
+        """
+        tokens, postings = self.tokens[column], self.postings[column]
+        matched = []
+        for term in terms:
+            if not term:
+                return np.arange(self.size)
+            if "," in term or term != term.strip():
+                matched.append(np.flatnonzero(self.contains_any(column, [term])))
+                continue
+            matched.extend(postings[i] for i, token in enumerate(tokens) if term in token)
+        if not matched:
+            return np.arange(0)
+        return np.unique(np.concatenate(matched))
+
+    def salary_rows(self, ranges):
+        """Sorted job ids whose salary falls in any of the inclusive (low, high) ranges.
+
+        Two binary searches per range over the sorted salaries; jobs without
+        a salary never match.
+        """
+        matched = []
+        for low, high in ranges:
+            start = np.searchsorted(self.salary_sorted, low, side="left")
+            end = np.searchsorted(self.salary_sorted, high, side="right")
+            matched.append(self.salary_order[start:end])
+        if not matched:
+            return np.arange(0)
+        return np.unique(np.concatenate(matched))
+
+    def skill_vector(self, skills):
+        # Weight per vocabulary skill: 1.0 for an exact match, the n-gram similarity for a close one, else 0
+        return self.skill_model.profile_vector(skills)
+
+    def skill_overlap(self, skills_set, rows=None):
+        # Similarity-weighted fraction of each job's (or each of rows') required skills covered by skills_set
+        if rows is None:
+            matched = self.skill_matrix @ self.skill_vector(skills_set)
+            return matched / np.maximum(self.skill_counts, 1)
+        matched = self.skill_matrix[rows] @ self.skill_vector(skills_set)
+        return matched / np.maximum(self.skill_counts[rows], 1)
+
+    def _skill_set_index(self):
+        # Vectors of the distinct "Skills Required" values, plus an ANN index once there are many
+        if self._skill_set_search is None:
+            sets = [split_skills(value) for value in self.categories["Skills Required"]]
+            incidence = _incidence(sets, self.skill_ids)
+            vectors = skill_set_vectors(self.skill_model, incidence)
+            self._skill_set_search = vectors, SkillANN(incidence, vectors) if len(sets) >= ANN_MIN_ITEMS else None
+        return self._skill_set_search
+
+    def similar_jobs(self, skills, min_similarity=SET_SIMILARITY_THRESHOLD):
+        """Sorted job ids whose skill set as a whole is close to the profile's skills.
+
+        Search runs over distinct skill sets, not rows, and goes through the
+        approximate index when the catalog has more than ANN_MIN_ITEMS of them.
+        """
+        weights = self.skill_vector(skills)
+        if self.skill_model.vectors is None or not weights.any():
+            return np.arange(0)
+        query = skill_set_vectors(self.skill_model, sparse.csr_matrix(weights))
+        vectors, ann = self._skill_set_index()
+        if ann is not None:
+            sets, _ = ann.query(weights, query, min_similarity)
+        else:
+            sets = np.flatnonzero((vectors @ query.T).toarray().ravel() >= min_similarity)
+        return np.flatnonzero(np.isin(self.codes["Skills Required"], sets))
@@ -0,0 +1,157 @@
+import base64
+import json
+
+import numpy as np
+
+# Recommendation buckets, best first, with the score each one must exceed
+BUCKETS = ("highly_matched", "jobs_after_courses", "suggested_jobs")
+BUCKET_THRESHOLDS = (0.7, 0.4)
+
+# Cursor position that sorts after every job (scores are never negative)
+EXHAUSTED = [-1.0, -1]
+
+
+def bucket_ids(scores):
+    # 0: score > 0.7, 1: 0.4 < score <= 0.7, 2: score <= 0.4
+    return np.where(scores > BUCKET_THRESHOLDS[0], 0, np.where(scores > BUCKET_THRESHOLDS[1], 1, 2))
+
+
+def top_k(scores, rows, k):
+    """Return the k best of rows, ordered by score descending then row ascending.
+
+    rows must be sorted ascending. Uses a partial partition so the cost is
+    O(len(rows) + k log k) instead of a full sort.
+    """
+    if k <= 0 or rows.size == 0:
+        return rows[:0]
+    row_scores = scores[rows]
+    if k < rows.size:
+        # k-th largest score; everything strictly above it is in, ties fill the rest by row
+        kth = -np.partition(-row_scores, k - 1)[k - 1]
+        above = row_scores > kth
+        ties = np.flatnonzero(row_scores == kth)[: k - int(above.sum())]
+        keep = np.concatenate((np.flatnonzero(above), ties))
+        rows, row_scores = rows[keep], row_scores[keep]
+    order = np.lexsort((rows, -row_scores))
+    return rows[order[:k]]
+
+
+def after(scores, rows, position):
+    # Rows strictly after a (score, row) position in ranking order
+    if position is None:
+        return rows
+    last_score, last_row = position
+    row_scores = scores[rows]
+    return rows[(row_scores < last_score) | ((row_scores == last_score) & (rows > last_row))]
+
+
+def _local(rows, position):
+    """Map a cursor position onto a ranking over a subset of jobs.
+
+    rows are the sorted job ids the ranking covers. Returns (score, local
+    index) that compares against local indexes the way the job id compares
+    against job ids.
+    """
+    if position is None or rows is None:
+        return position
+    last_score, last_row = position
+    return last_score, int(np.searchsorted(rows, last_row, side="right")) - 1
+
+
+def encode_cursor(positions):
+    payload = json.dumps(positions, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {bucket: tuple(positions[bucket]) if positions.get(bucket) else None for bucket in BUCKETS}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def paginate_buckets(scores, page=1, per_page=5, cursor=None, rows=None):
+    """Split scored jobs into buckets and select one page of each in a single pass.
+
+    With a cursor (from a previous response's next_cursor) each bucket resumes
+    after the last job it returned; otherwise page is used as an offset.
+    When the scores cover only some jobs, rows are their sorted job ids.
+    Returns ({bucket: rows}, {bucket: has_more}, next_cursor).
+    """
+    job_ids = np.arange(len(scores)) if rows is None else rows
+    ids = bucket_ids(scores)
+    # Stable sort on the small bucket ids groups rows per bucket, ascending within each
+    grouped = np.argsort(ids, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(ids, minlength=len(BUCKETS)))))
+    positions = decode_cursor(cursor) if cursor else None
+
+    pages, has_more, next_positions = {}, {}, {}
+    for b, bucket in enumerate(BUCKETS):
+        members = grouped[bounds[b]:bounds[b + 1]]
+        if positions is not None:
+            remaining = after(scores, members, _local(rows, positions[bucket]))
+            selected = top_k(scores, remaining, per_page)
+            has_more[bucket] = remaining.size > per_page
+        else:
+            start_idx = (page - 1) * per_page
+            selected = top_k(scores, members, start_idx + per_page)[start_idx:]
+            has_more[bucket] = members.size > start_idx + per_page
+        pages[bucket] = job_ids[selected]
+
+        if selected.size:
+            last = int(selected[-1])
+            next_positions[bucket] = [float(scores[last]), int(job_ids[last])]
+        else:
+            next_positions[bucket] = EXHAUSTED
+
+    return pages, has_more, encode_cursor(next_positions)
+
+
+class Ranking:
+    """Every scored job ranked within its bucket, so any page is a slice.
+
+    Built once per profile and kept in the ranking cache; later pages for the
+    same profile are served without rescoring. When only some jobs were
+    scored, rows are their sorted job ids. Holds the scores and one int32
+    ranking per bucket, about 12 bytes per scored job.
+    """
+
+    def __init__(self, scores, rows=None):
+        self.scores = scores
+        self.rows = rows
+        ids = bucket_ids(scores)
+        # Bucket first, then score descending, then row ascending
+        order = np.lexsort((np.arange(len(scores)), -scores, ids)).astype(np.int32)
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(ids, minlength=len(BUCKETS)))))
+        self.buckets = {bucket: order[bounds[b]:bounds[b + 1]] for b, bucket in enumerate(BUCKETS)}
+
+    @property
+    def nbytes(self):
+        # The bucket rankings are disjoint slices of one array
+        ranked = sum(r.nbytes for r in self.buckets.values())
+        return self.scores.nbytes + ranked + (0 if self.rows is None else self.rows.nbytes)
+
+    def _start(self, bucket, position):
+        # Ranked jobs at or before the cursor's (score, row) position
+        if position is None:
+            return 0
+        ranked = self.buckets[bucket]
+        return ranked.size - after(self.scores, ranked, _local(self.rows, position)).size
+
+    def page(self, page=1, per_page=5, cursor=None):
+        # Same contract as paginate_buckets
+        positions = decode_cursor(cursor) if cursor else None
+        pages, has_more, next_positions = {}, {}, {}
+        for bucket in BUCKETS:
+            ranked = self.buckets[bucket]
+            start_idx = self._start(bucket, positions[bucket]) if positions else (page - 1) * per_page
+            selected = ranked[start_idx:start_idx + per_page]
+            pages[bucket] = selected if self.rows is None else self.rows[selected]
+            has_more[bucket] = ranked.size > start_idx + per_page
+            if selected.size:
+                last = int(selected[-1])
+                next_positions[bucket] = [float(self.scores[last]), last if self.rows is None else int(self.rows[last])]
+            else:
+                next_positions[bucket] = EXHAUSTED
+        return pages, has_more, encode_cursor(next_positions)
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class RankingCache:
+    """Bounded LRU cache with a TTL for per-profile rankings.
+
+    Bounded both by entry count and by the total nbytes of the cached values,
+    since a ranking grows with the catalog (about 12 MB at 1M jobs); a value
+    larger than max_bytes on its own is returned but not cached.
+
+    Entries belong to the dataset version that is current, as reported by
+    current_version (by default, whichever version was looked up last). When
+    it changes, everything cached for the old version is dropped; requests
+    still pinned to an older index during a reload are computed but neither
+    served from nor stored in the cache, so they can't evict the new rankings.
+    Safe to share between request threads.
+    """
+
+    def __init__(self, maxsize=256, ttl=600, max_bytes=256 * 1024 * 1024, current_version=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.current_version = current_version
+        self.version = None
+        self.stale = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, version, key, compute):
+        current = self.current_version() if self.current_version is not None else version
+        if version != current:
+            with self._lock:
+                self.stale += 1
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.bytes = 0
+                self.version = version
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Compute outside the lock so a slow miss doesn't block hits for other profiles
+        value = compute()
+
+        size = getattr(value, "nbytes", 0)
+        with self._lock:
+            if version == self.version and size <= self.max_bytes:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self.bytes -= old[2]
+                self._entries[key] = (time.monotonic(), value, size)
+                self.bytes += size
+                while len(self._entries) > self.maxsize or self.bytes > self.max_bytes:
+                    self.bytes -= self._entries.popitem(last=False)[1][2]
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,70 @@
+import numpy as np
+
+from filters import location_terms
+
+# Upper bound on profiles x jobs cells scored at once (float64, ~32 MB)
+BATCH_CELLS = 1 << 22
+
+# Weights of the overall match score; they sum to 1.0
+SKILL_WEIGHT = 0.4
+LOCATION_WEIGHT = 0.3
+DISABILITY_BONUS = 0.2
+WORK_MODE_BONUS = 0.1
+
+# Location score of a job in a city near one of the user's (1.0 in theirs, 0.5 anywhere else)
+NEARBY_SCORE = 0.75
+
+
+def _location_table(index, cities):
+    # Per distinct job location: 1.0 in one of the user's cities (or any, when none are given),
+    # NEARBY_SCORE in a nearby city, 0.5 for any other known location
+    if not cities:
+        return np.ones(len(index.categories["Workplace Location"]))
+    known = np.array([bool(v) for v in index.categories["Workplace Location"]])
+    exact, nearby = location_terms(cities)
+    return np.where(
+        index.category_hits_any("Workplace Location", exact), 1.0,
+        np.where(index.category_hits_any("Workplace Location", nearby), NEARBY_SCORE, np.where(known, 0.5, 0.0))
+    )
+
+
+def overall_scores(index, disability_list, skills_set, work_mode_list, cities, rows=None):
+    """Score every job in the index (or only rows) against one normalized profile.
+
+    The skill term is a single sparse product over the job x skill matrix; the
+    disability, work mode and location terms are boolean masks built from the
+    categorical codes. Returns a float array aligned with index.frame, or
+    with rows when given.
+    """
+    select = slice(None) if rows is None else rows
+    scores = index.skill_overlap(skills_set, rows) * SKILL_WEIGHT
+    scores += _location_table(index, cities)[index.codes["Workplace Location"][select]] * LOCATION_WEIGHT
+    scores += np.where(index.category_hits_any("Disability", disability_list)[index.codes["Disability"][select]], DISABILITY_BONUS, 0.0)
+    scores += np.where(index.category_hits_any("Work Mode", work_mode_list)[index.codes["Work Mode"][select]], WORK_MODE_BONUS, 0.0)
+    return scores
+
+
+def overall_scores_batch(index, profiles):
+    """Score many normalized profiles at once as a profiles x jobs matrix.
+
+    Yields (offset, scores) chunks so memory stays bounded for large catalogs;
+    row i of a chunk is the same array overall_scores returns for
+    profiles[offset + i] over every job.
+    """
+    chunk = max(1, BATCH_CELLS // max(index.size, 1))
+    counts = np.maximum(index.skill_counts, 1)
+    for offset in range(0, len(profiles), chunk):
+        batch = profiles[offset:offset + chunk]
+        users = np.vstack([index.skill_vector(skills_set) for _, skills_set, *_ in batch]).reshape(len(batch), -1)
+        # (jobs x skills) @ (skills x profiles): matched skill counts for every pair
+        matched = np.asarray(index.skill_matrix @ users.T).T
+
+        # profiles x distinct values tables, broadcast to profiles x jobs through the codes
+        location = np.vstack([_location_table(index, cities) for _, _, _, cities, *_ in batch])
+        disability = np.vstack([index.category_hits_any("Disability", terms) for terms, *_ in batch])
+        work_mode = np.vstack([index.category_hits_any("Work Mode", terms) for _, _, terms, *_ in batch])
+
+        scores = (matched / counts) * SKILL_WEIGHT + location[:, index.codes["Workplace Location"]] * LOCATION_WEIGHT
+        scores += np.where(disability[:, index.codes["Disability"]], DISABILITY_BONUS, 0.0)
+        scores += np.where(work_mode[:, index.codes["Work Mode"]], WORK_MODE_BONUS, 0.0)
+        yield offset, scores
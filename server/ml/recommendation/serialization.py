@@ -0,0 +1,56 @@
+from flask import Response, jsonify
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Catalog columns copied into each job record, in response order around the skill fields
+LEADING_COLUMNS = ("Job Role", "Skills Required")
+TRAILING_COLUMNS = ("Salary (INR)", "Workplace Location")
+
+
+def job_records(index, rows, weights):
+    """Response records for rows, in the given order, built column-wise.
+
+    weights is the profile's skill vector (index.skill_vector). A job skill is
+    matched when its weight is positive, the same test scoring used, so the
+    matched/missing split comes from the skill matrix instead of re-splitting
+    "Skills Required". Courses come from the index's per-skill table.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if rows.size == 0:
+        return []
+    frame = index.frame
+    columns = {col: frame[col].take(rows).tolist() for col in LEADING_COLUMNS + TRAILING_COLUMNS}
+
+    # Vocabulary ids per row, ascending, so skills come out alphabetically
+    jobs = index.skill_matrix[rows]
+    ids = jobs.indices.tolist()
+    matched = (weights[jobs.indices] > 0).tolist()
+    bounds = jobs.indptr.tolist()
+    skills, courses = index.skills, index.skill_courses
+
+    records = []
+    for i in range(rows.size):
+        hit, miss = [], []
+        for j in range(bounds[i], bounds[i + 1]):
+            (hit if matched[j] else miss).append(ids[j])
+        records.append({
+            "Job Role": columns["Job Role"][i],
+            "Skills Required": columns["Skills Required"][i],
+            "Matched Skills": ", ".join(skills[k] for k in hit) if hit else "None",
+            "Missing Skills": ", ".join(skills[k] for k in miss) if miss else "None",
+            "Recommended Courses": ", ".join(courses[k] for k in miss) if miss else "No courses needed",
+            "Salary (INR)": columns["Salary (INR)"][i],
+            "Workplace Location": columns["Workplace Location"][i],
+        })
+    return records
+
+
+def json_response(payload, status=200):
+    # orjson when installed: several times faster than the stdlib encoder on large pages and batches
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), status=status, mimetype="application/json")
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from skill_vocabulary import normalize_skill
+
+# Minimum character n-gram cosine for a user skill to count as a vocabulary skill
+# ("powerbi" ~ "power bi" at 0.82, "java" ~ "javascript" at 0.52 stays out)
+SIMILARITY_THRESHOLD = float(os.getenv("SKILL_SIMILARITY_THRESHOLD", 0.6))
+
+# Minimum cosine between a profile and a job's whole skill set for similar_jobs
+SET_SIMILARITY_THRESHOLD = float(os.getenv("SKILL_SET_SIMILARITY_THRESHOLD", 0.3))
+
+# Distinct skill sets above which similar_jobs goes through the inverted-file index instead of a full product
+ANN_MIN_ITEMS = int(os.getenv("SKILL_ANN_MIN_ITEMS", 20000))
+
+# Bound on memoized user skills; user input makes the key space open-ended
+MAX_MEMOIZED_SKILLS = 4096
+
+class SkillModel:
+    """Character n-gram TF-IDF model of the catalog's skill vocabulary.
+
+    Maps free-form user skills onto vocabulary skills by cosine similarity,
+    so "Power BI", "powerbi" and "power-bi" all land on "power bi". Fitted
+    on the vocabulary only, which stays small even for large catalogs.
+    """
+
+    def __init__(self, vocabulary, threshold=SIMILARITY_THRESHOLD):
+        self.vocabulary = tuple(vocabulary)
+        self.ids = {skill: i for i, skill in enumerate(self.vocabulary)}
+        self.threshold = threshold
+        self._memo = {}
+        if self.vocabulary:
+            self.vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 4), sublinear_tf=True)
+            # Rows are L2-normalized, so products between them are cosine similarities
+            self.vectors = self.vectorizer.fit_transform(self.vocabulary)
+        else:
+            self.vectorizer = self.vectors = None
+
+    def similarities(self, skill):
+        # Similarity of one user skill to every vocabulary skill, zeroed below the threshold
+        skill = normalize_skill(skill)
+        weights = self._memo.get(skill)
+        if weights is None:
+            weights = np.zeros(len(self.vocabulary))
+            if skill in self.ids:
+                weights[self.ids[skill]] = 1.0
+            elif skill and self.vectorizer is not None:
+                weights = (self.vectors @ self.vectorizer.transform([skill]).T).toarray().ravel()
+                weights[weights < self.threshold] = 0.0
+            weights.setflags(write=False)
+            if len(self._memo) >= MAX_MEMOIZED_SKILLS:
+                self._memo.clear()
+            self._memo[skill] = weights
+        return weights
+
+    def profile_vector(self, skills):
+        """Soft indicator over the vocabulary: for each vocabulary skill, its best similarity to any user skill."""
+        vector = np.zeros(len(self.vocabulary))
+        for skill in skills:
+            np.maximum(vector, self.similarities(skill), out=vector)
+        return vector
+
+
+class SkillANN:
+    """Approximate nearest-neighbour search over skill sets, by inverted file.
+
+    Candidates are the sets sharing at least one vocabulary skill the profile
+    matched (exactly or by similarity); only those are compared exactly. Sets
+    that are merely close in n-gram space without sharing a matched skill are
+    skipped, which is the approximation. Query cost follows the posting list
+    sizes instead of the number of sets.
+    """
+
+    def __init__(self, incidence, vectors):
+        # Column-major incidence: column j lists the sets containing vocabulary skill j
+        self.postings = incidence.tocsc()
+        self.vectors = vectors
+
+    def query(self, weights, vector, min_similarity):
+        """(rows, similarities) of the candidate rows at or above min_similarity."""
+        columns = self.postings[:, np.flatnonzero(weights)]
+        rows = np.unique(columns.indices)
+        if rows.size == 0:
+            return rows, np.zeros(0)
+        similarity = (self.vectors[rows] @ vector.T).toarray().ravel()
+        keep = similarity >= min_similarity
+        return rows[keep], similarity[keep]
+
+
+def skill_set_vectors(model, incidence):
+    # n-gram space vector per skill set: the normalized sum of its skills' vectors
+    if model.vectors is None:
+        return incidence
+    return normalize(incidence @ model.vectors)
@@ -0,0 +1,68 @@
+import csv
+import os
+
+# Standard library only, so lightweight consumers (resume_parser) can share it without the index's dependencies
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "merged_job_dataset.csv")
+SKILLS_COLUMN = "Skills Required"
+
+# Other ways people write a skill -> the catalog spelling: abbreviations character
+# n-grams can't relate to the spelled-out skill, and common variants
+ALIASES = {
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "js": "javascript",
+    "java script": "javascript",
+    "ts": "typescript",
+    "ps": "adobe photoshop",
+    "photoshop": "adobe photoshop",
+    "adobe illustrator": "illustrator",
+    "bi": "power bi",
+    "powerbi": "power bi",
+    "microsoft power bi": "power bi",
+    "cad": "autocad",
+    "auto cad": "autocad",
+    "solid works": "solidworks",
+    "smm": "social media marketing",
+    "social media": "social media marketing",
+    "problem solving": "problem-solving",
+    "search engine optimization": "seo",
+    "search engine optimisation": "seo",
+    "recruiting": "recruitment",
+    "talent acquisition": "recruitment",
+    "customer support": "customer service",
+    "copywriting": "writing",
+    "content writing": "writing",
+    "lesson planning": "curriculum planning",
+    "public speaker": "public speaking",
+    "network administration": "networking",
+    "cyber security": "security",
+    "cybersecurity": "security",
+    "information security": "security",
+    "mysql": "sql",
+    "postgresql": "sql",
+}
+
+# Aliases that are also everyday words or initials in running text: trusted when a
+# user lists them as skills, not when they turn up in a resume
+AMBIGUOUS_IN_TEXT = frozenset({"ml", "ai", "ts", "ps", "bi"})
+
+
+def normalize_skill(skill):
+    skill = " ".join(str(skill).lower().split())
+    return ALIASES.get(skill, skill)
+
+
+def split_skills(skills_str):
+    return frozenset(s.strip() for s in skills_str.split(",") if s.strip()) if skills_str else frozenset()
+
+
+def vocabulary(skill_sets):
+    # Sorted distinct skills; position in this tuple is a skill's id (JobIndex.skills)
+    return tuple(sorted(set().union(*skill_sets)))
+
+
+def catalog_skills(csv_path=DATASET_PATH):
+    # JobIndex.skills of the catalog at csv_path, read with the csv module alone
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return vocabulary(split_skills((row.get(SKILLS_COLUMN) or "").lower()) for row in csv.DictReader(f))
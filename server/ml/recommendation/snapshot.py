@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from job_index import DATASET_PATH, NORMALIZED_COLUMNS, JobIndex, dataset_version
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_index.snapshot")
+SNAPSHOT_FORMAT = 2
+
+# Columnar layout: every column is a .npy array (strings as int32 codes into a
+# category list in manifest.json), plus the skill matrix and posting lists.
+# Arrays are loaded memory-mapped and stay that way: string columns are only
+# decoded for the rows being serialized, so processes reading one snapshot
+# share its pages through the page cache.
+
+
+class CodedColumn:
+    """A string column kept as memory-mapped int32 codes; values are decoded per lookup."""
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        # Code -1 (missing value) indexes the trailing entry
+        self.categories = np.array(list(categories) + [None if categories else ""], dtype=object)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def take(self, rows):
+        return self.categories[self.codes[rows]]
+
+    def to_numpy(self):
+        return self.categories[self.codes]
+
+
+class ColumnFrame:
+    """Read-only stand-in for the DataFrame of an index restored from a snapshot.
+
+    Supports what the services use on index.frame: column lookup, `in`,
+    len() and .columns. Numeric columns are the mapped arrays themselves.
+    """
+
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self.columns = list(columns)
+        self._rows = rows
+
+    def __getitem__(self, col):
+        return self._columns[col]
+
+    def __contains__(self, col):
+        return col in self._columns
+
+    def __len__(self):
+        return self._rows
+
+
+def _source_stat(csv_path):
+    stat = os.stat(csv_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def write_snapshot(index, directory=SNAPSHOT_DIR, csv_path=DATASET_PATH):
+    # Write into a temporary sibling directory and rename, so readers never see a partial snapshot
+    parent = os.path.dirname(os.path.abspath(directory))
+    tmp = tempfile.mkdtemp(prefix=".snapshot-", dir=parent)
+
+    try:
+        def save(name, array):
+            np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(array))
+
+        columns, categories = [], {}
+        for i, col in enumerate(index.frame.columns):
+            if col in index.codes:
+                codes, uniques = index.codes[col], list(index.categories[col])
+            elif pd.api.types.is_numeric_dtype(index.frame[col]):
+                save(f"column_{i}", np.asarray(index.frame[col]))
+                columns.append({"name": col, "kind": "numeric"})
+                continue
+            else:
+                codes, uniques = pd.factorize(index.frame[col].to_numpy())
+                uniques = list(uniques)
+            save(f"column_{i}", codes.astype(np.int32))
+            columns.append({"name": col, "kind": "category"})
+            categories[col] = uniques
+
+        save("skill_data", index.skill_matrix.data)
+        save("skill_indptr", index.skill_matrix.indptr)
+        save("skill_indices", index.skill_matrix.indices)
+        for i, col in enumerate(NORMALIZED_COLUMNS):
+            postings = index.postings[col]
+            save(f"postings_{i}", np.concatenate(postings) if postings else np.arange(0))
+            save(f"posting_offsets_{i}", np.cumsum([0] + [len(p) for p in postings]))
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": index.version,
+            "rows": index.size,
+            "columns": columns,
+            "categories": categories,
+            "tokens": {col: list(index.tokens[col]) for col in NORMALIZED_COLUMNS},
+            **_source_stat(csv_path),
+        }
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.replace(tmp, directory)
+
+
+def read_manifest(directory=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(directory, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(directory=SNAPSHOT_DIR, mmap_mode="r"):
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get("format") != SNAPSHOT_FORMAT:
+        raise FileNotFoundError(f"No usable job index snapshot in {directory}")
+
+    def load(name):
+        return np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+
+    data, codes, categories = {}, {}, {}
+    for i, column in enumerate(manifest["columns"]):
+        col, array = column["name"], load(f"column_{i}")
+        if column["kind"] == "numeric":
+            data[col] = array
+            continue
+        uniques = manifest["categories"][col]
+        data[col] = CodedColumn(array, uniques)
+        if col in NORMALIZED_COLUMNS:
+            codes[col] = array
+            categories[col] = tuple(uniques)
+    frame = ColumnFrame(data, manifest["rows"])
+
+    values, indptr, indices = load("skill_data"), load("skill_indptr"), load("skill_indices")
+    tokens, postings = {}, {}
+    for i, col in enumerate(NORMALIZED_COLUMNS):
+        tokens[col] = tuple(manifest["tokens"][col])
+        flat, offsets = load(f"postings_{i}"), load(f"posting_offsets_{i}")
+        postings[col] = tuple(flat[offsets[j]:offsets[j + 1]] for j in range(len(tokens[col])))
+    skill_matrix = sparse.csr_matrix(
+        (values, indices, indptr), shape=(manifest["rows"], len(tokens["Skills Required"])), copy=False
+    )
+    return JobIndex.restore(frame, manifest["version"], skill_matrix, codes, categories, tokens, postings)
+
+
+def is_fresh(manifest, csv_path=DATASET_PATH):
+    # Cheap stat check first; only hash the CSV when size or mtime moved
+    if manifest is None or manifest.get("format") != SNAPSHOT_FORMAT:
+        return False
+    if all(manifest.get(k) == v for k, v in _source_stat(csv_path).items()):
+        return True
+    return manifest.get("version") == dataset_version(csv_path)
+
+
+def load_index(csv_path=DATASET_PATH, directory=SNAPSHOT_DIR):
+    """Load the job index from its snapshot, rebuilding it from the CSV when stale.
+
+    The CSV stays the source of truth. Failing to write a fresh snapshot (e.g.
+    on a read-only filesystem) is not fatal; the index built from the CSV is used.
+    """
+    if is_fresh(read_manifest(directory), csv_path):
+        try:
+            return read_snapshot(directory)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable job index snapshot: {e}")
+
+    index = JobIndex.from_csv(csv_path)
+    try:
+        write_snapshot(index, directory, csv_path)
+    except OSError as e:
+        print(f"Could not write job index snapshot: {e}")
+    return index
+
+
+if __name__ == "__main__":
+    # Build step: python snapshot.py [dataset.csv] [snapshot_dir]
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATASET_PATH
+    directory = sys.argv[2] if len(sys.argv) > 2 else SNAPSHOT_DIR
+    index = JobIndex.from_csv(csv_path)
+    write_snapshot(index, directory, csv_path)
+    print(f"Wrote snapshot of {index.size} jobs (version {index.version}) to {directory}")
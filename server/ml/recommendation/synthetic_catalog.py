@@ -0,0 +1,56 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from job_index import DATASET_PATH, split_skills
+
+# Share of rows whose skills are a fresh combination of vocabulary skills rather
+# than one of the source's skill sets, so large catalogs have many distinct sets
+NOVEL_SKILL_RATE = 0.1
+
+
+def _sample(rng, column, n):
+    # Draw n values with the column's observed frequencies
+    counts = column.fillna("").value_counts()
+    return rng.choice(counts.index.to_numpy(dtype=object), size=n, p=(counts / counts.sum()).to_numpy())
+
+
+def generate_catalog(rows, seed=0, source=DATASET_PATH, novel_skill_rate=NOVEL_SKILL_RATE):
+    """A synthetic job catalog with the schema and value distributions of the source dataset.
+
+    Every column is sampled independently from the source's empirical
+    distribution; salaries are uniform over the source's range.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source)
+
+    df = pd.DataFrame({"Job ID": np.arange(1, rows + 1)})
+    for col in base.columns:
+        if col == "Job ID":
+            continue
+        if col == "Salary (INR)":
+            df[col] = rng.integers(base[col].min(), base[col].max() + 1, size=rows)
+        else:
+            df[col] = _sample(rng, base[col], rows)
+
+    # Original casing of every skill, e.g. "Power BI"
+    vocabulary = sorted(set().union(*(split_skills(s) for s in base["Skills Required"].dropna())))
+    novel = np.flatnonzero(rng.random(rows) < novel_skill_rate)
+    sizes = rng.integers(2, 5, size=len(novel))
+    df.loc[novel, "Skills Required"] = [", ".join(rng.choice(vocabulary, size=k, replace=False)) for k in sizes]
+    return df
+
+
+def write_catalog(rows, path, seed=0, source=DATASET_PATH):
+    df = generate_catalog(rows, seed, source)
+    df.to_csv(path, index=False)
+    return df
+
+
+if __name__ == "__main__":
+    # python synthetic_catalog.py ROWS OUTPUT.csv [SEED]
+    rows, path = int(sys.argv[1]), sys.argv[2]
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    write_catalog(rows, path, seed)
+    print(f"Wrote {rows} synthetic jobs to {path}")
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.getenv(
+    "CONTENT_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "content_cache.sqlite3")
+)
+CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Seconds an entry's last-read time may lag, so most hits stay read-only and don't take SQLite's write lock
+ACCESS_RESOLUTION = float(os.getenv("CONTENT_CACHE_ACCESS_RESOLUTION", 300))
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_text(text):
+    # Whitespace and case differences don't change what a description says
+    return hashlib.sha256(" ".join(text.split()).lower().encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """Content-addressed store on SQLite, bounded by total value size.
+
+    Keys are (namespace, content hash); values are JSON. When the store
+    grows past max_bytes the least recently read entries are evicted.
+    Read times are kept to within access_resolution seconds, and the total
+    size is kept up to date by triggers in a one-row meta table, so neither
+    a hit nor a put scans or rewrites more than it must.
+    Safe to share between threads and worker processes.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES, access_resolution=ACCESS_RESOLUTION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_resolution = access_resolution
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            # Running total of entries.size; seeded once from the entries already there
+            db.execute("CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)")
+            db.execute("INSERT OR IGNORE INTO meta (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries"
+                " BEGIN UPDATE meta SET total = total + new.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries"
+                " BEGIN UPDATE meta SET total = total + new.size - old.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries"
+                " BEGIN UPDATE meta SET total = total - old.size; END"
+            )
+
+    def _connect(self):
+        # Connections are per thread, and never reused across a fork
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get(self, namespace, key):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT value, accessed FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > self.access_resolution:
+                db.execute(
+                    "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+                )
+        return json.loads(row[0])
+
+    def put(self, namespace, key, value):
+        payload = json.dumps(value)
+        with self._connect() as db:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete wouldn't fire the size trigger
+            db.execute(
+                "INSERT INTO entries (namespace, key, value, size, accessed) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (namespace, key) DO UPDATE"
+                " SET value = excluded.value, size = excluded.size, accessed = excluded.accessed",
+                (namespace, key, payload, len(payload), time.time()),
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT total FROM meta").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk from least recently read and drop until back under the bound
+        excess = total - self.max_bytes
+        doomed = []
+        for namespace, key, size in db.execute("SELECT namespace, key, size FROM entries ORDER BY accessed"):
+            doomed.append((namespace, key))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", doomed)
+
+    def get_or_compute(self, namespace, key, compute):
+        value = self.get(namespace, key)
+        if value is None:
+            value = compute()
+            self.put(namespace, key, value)
+        return value
+
+    def stats(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace").fetchall()
+        return {namespace: {"entries": count, "bytes": size} for namespace, count, size in rows}
+
+
+_cache = None
+
+
+def get_cache():
+    # Shared process-wide instance, opened on first use
+    global _cache
+    if _cache is None:
+        _cache = ContentCache()
+    return _cache
@@ -52,15 +52,31 @@
 #         # raise RuntimeError("OpenAI API error: " + str(e))
 
 
-from dotenv import load_dotenv
+import asyncio
+import csv
 import os
-import openai
+import sys
 
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from content_cache import get_cache, sha256_text
+from resume_parser import iter_resume_text
 
-def extract_job_requirements(job_description: str) -> list:
-    if not openai.api_key:
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_client import get_client, run_sync
+
+REQUIREMENTS_MODEL = "gpt-4-turbo"
+CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "recommendation", "merged_job_dataset.csv"
+)
+
+async def extract_job_requirements_async(job_description: str) -> list:
+    # A description seen before (ignoring whitespace and case) is answered from the cache
+    cache_key = f"{REQUIREMENTS_MODEL}:{sha256_text(job_description)}"
+    cached = get_cache().get("job_requirements", cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_client("openai")
+    if not client.api_key:
         raise EnvironmentError("❌ OPENAI_API_KEY not found in .env")
 
     prompt = f"""
@@ -69,19 +85,21 @@ def extract_job_requirements(job_description: str) -> list:
     """
 
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo",
-            messages=[
+        response = await client.chat(
+            [
                 {"role": "system", "content": "You extract clean, clear job requirements from descriptions."},
                 {"role": "user", "content": prompt}
             ],
+            model=REQUIREMENTS_MODEL,
             temperature=0.5,
         )
 
-        content = response['choices'][0]['message']['content']
+        content = response.content
         lines = content.split('\n')
         requirements = [line.lstrip("-• ").strip() for line in lines if line.strip()]
 
+        # Only real answers are cached; the fallback below is not
+        get_cache().put("job_requirements", cache_key, requirements)
         return requirements
 
     except Exception as e:
@@ -93,3 +111,44 @@ def extract_job_requirements(job_description: str) -> list:
             "Experience with software development",
             "Strong communication skills"
         ]
+
+def extract_job_requirements(job_description: str) -> list:
+    return run_sync(extract_job_requirements_async(job_description))
+
+# Description text sent to the model per document; later pages are never parsed
+MAX_DESCRIPTION_CHARS = 12000
+
+def extract_job_requirements_from_file(file_path: str) -> list:
+    # Stream the document and stop reading once the prompt budget is filled
+    parts, size = [], 0
+    for chunk in iter_resume_text(file_path):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= MAX_DESCRIPTION_CHARS:
+            break
+    return extract_job_requirements("\n".join(parts)[:MAX_DESCRIPTION_CHARS])
+
+def describe_catalog_job(row: dict) -> str:
+    # Catalog jobs have no free-text description; this stands in for one, and is also the cache key
+    return f"Job Role: {row['Job Role']}\nSkills Required: {row['Skills Required']}"
+
+async def job_requirements_for_catalog_job_async(row: dict) -> list:
+    return await extract_job_requirements_async(describe_catalog_job(row))
+
+def job_requirements_for_catalog_job(row: dict) -> list:
+    """Requirements of a catalog job (a row of merged_job_dataset.csv), answered from the warmed cache."""
+    return run_sync(job_requirements_for_catalog_job_async(row))
+
+async def _warm(rows):
+    await asyncio.gather(*(job_requirements_for_catalog_job_async(row) for row in rows))
+
+def warm_job_requirements(csv_path: str = CATALOG_PATH) -> int:
+    # Pre-populate the cache for job_requirements_for_catalog_job, once per distinct role and skill set;
+    # the client's semaphore bounds how many of these run at once
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = {describe_catalog_job(row): row for row in csv.DictReader(f)}
+    run_sync(_warm([rows[key] for key in sorted(rows)]))
+    return len(rows)
+
+if __name__ == "__main__":
+    print(f"Warmed job requirements cache with {warm_job_requirements()} catalog descriptions")
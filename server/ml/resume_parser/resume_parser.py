@@ -1,19 +1,155 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pdfplumber
 from docx import Document
 
-def extract_text_from_pdf(pdf_path):
+from content_cache import get_cache, sha256_file
+from skill_extractor import extract_skills
+
+# Guards so one oversized or scanned upload can't pin a worker:
+# pages read per PDF and UTF-8 bytes of text returned per document
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", 50))
+MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", 512 * 1024))
+
+# PDFs longer than this are split into page ranges across the process pool
+PARALLEL_PAGE_THRESHOLD = 20
+WORKERS = int(os.getenv("RESUME_PARSER_WORKERS", os.cpu_count() or 1))
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # Created lazily, often from a request thread: forking a multi-threaded process can deadlock,
+        # so workers start from a clean forkserver process instead
+        _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+
+def _limit_bytes(chunks, max_bytes):
+    # Pass chunks through until max_bytes of UTF-8 text, truncating the last one
+    remaining = max_bytes
+    for chunk in chunks:
+        size = len(chunk.encode("utf-8"))
+        if size > remaining:
+            yield chunk.encode("utf-8")[:remaining].decode("utf-8", errors="ignore")
+            return
+        remaining -= size
+        yield chunk
+
+
+def _pdf_pages(pdf_path, first, last):
+    # Text of pages [first, last), each page extracted once and released right after
     with pdfplumber.open(pdf_path) as pdf:
-        text = "\n".join([page.extract_text() for page in pdf.pages if page.extract_text()])
-    return text
+        for page in pdf.pages[first:last]:
+            text = page.extract_text()
+            page.flush_cache()
+            if text:
+                yield text
+
 
-def extract_text_from_docx(docx_path):
+def _pdf_page_range_text(args):
+    # Each range stops on its own at max_bytes: the document as a whole never needs more
+    pdf_path, first, last, max_bytes = args
+    return list(_limit_bytes(_pdf_pages(pdf_path, first, last), max_bytes))
+
+
+def iter_text_from_pdf(pdf_path, max_pages=MAX_PAGES, max_bytes=MAX_BYTES):
+    """Yield the text of each page lazily, stopping at max_pages or max_bytes."""
+    return _limit_bytes(_pdf_pages(pdf_path, 0, max_pages), max_bytes)
+
+
+def iter_text_from_docx(docx_path, max_bytes=MAX_BYTES):
     doc = Document(docx_path)
-    return "\n".join([p.text for p in doc.paragraphs])
+    return _limit_bytes((p.text for p in doc.paragraphs), max_bytes)
 
-def extract_resume_text(file_path):
+
+def iter_resume_text(file_path, max_pages=MAX_PAGES, max_bytes=MAX_BYTES):
+    """Streaming variant of extract_resume_text: yields text chunks (pages or paragraphs).
+
+    Consumers that only need a prefix of the document can stop iterating
+    early and the remaining pages are never parsed.
+    """
     if file_path.endswith(".pdf"):
-        return extract_text_from_pdf(file_path)
+        return iter_text_from_pdf(file_path, max_pages, max_bytes)
+    elif file_path.endswith(".docx"):
+        return iter_text_from_docx(file_path, max_bytes)
+    else:
+        raise ValueError("Unsupported file format")
+
+
+def extract_text_from_pdf(pdf_path, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, parallel=True):
+    if parallel:
+        with pdfplumber.open(pdf_path) as pdf:
+            page_count = min(len(pdf.pages), max_pages)
+    if not parallel or page_count <= PARALLEL_PAGE_THRESHOLD:
+        return "\n".join(iter_text_from_pdf(pdf_path, max_pages, max_bytes))
+
+    # Long documents: extract page ranges in parallel, keeping page order
+    step = -(-page_count // WORKERS)
+    ranges = [(pdf_path, first, min(first + step, page_count), max_bytes) for first in range(0, page_count, step)]
+    futures = [_get_pool().submit(_pdf_page_range_text, r) for r in ranges]
+    try:
+        pages = (text for future in futures for text in future.result())
+        return "\n".join(_limit_bytes(pages, max_bytes))
+    finally:
+        # Ranges after the byte cap was reached are not needed; drop those that haven't started
+        for future in futures:
+            future.cancel()
+
+
+def extract_text_from_docx(docx_path, max_bytes=MAX_BYTES):
+    return "\n".join(iter_text_from_docx(docx_path, max_bytes))
+
+
+def _extract_resume_text(file_path, parallel=True):
+    if file_path.endswith(".pdf"):
+        return extract_text_from_pdf(file_path, parallel=parallel)
     elif file_path.endswith(".docx"):
         return extract_text_from_docx(file_path)
     else:
         return "Unsupported file format"
+
+
+def _cache_key(file_path):
+    # Same bytes parsed with the same limits always give the same text
+    return f"{sha256_file(file_path)}:{MAX_PAGES}:{MAX_BYTES}"
+
+
+def extract_resume_text(file_path):
+    if not file_path.endswith((".pdf", ".docx")):
+        return "Unsupported file format"
+    return get_cache().get_or_compute("resume_text", _cache_key(file_path), lambda: _extract_resume_text(file_path))
+
+
+def _extract_resume_text_serial(file_path):
+    # Pool workers must not fan out into a pool of their own
+    return _extract_resume_text(file_path, parallel=False)
+
+
+def extract_resume_texts(file_paths):
+    """Extract many resumes across the process pool, returning texts in input order.
+
+    Files already in the content cache are not sent to the pool.
+    """
+    cache = get_cache()
+    keys = [_cache_key(path) if path.endswith((".pdf", ".docx")) else None for path in file_paths]
+    texts = [cache.get("resume_text", key) if key else "Unsupported file format" for key in keys]
+    misses = [i for i, text in enumerate(texts) if text is None]
+    for i, text in zip(misses, _get_pool().map(_extract_resume_text_serial, [file_paths[i] for i in misses])):
+        cache.put("resume_text", keys[i], text)
+        texts[i] = text
+    return texts
+
+
+def extract_resume_skills(file_path):
+    # Catalog skills mentioned in the resume, in the form /recommend_jobs takes; no LLM call
+    text = extract_resume_text(file_path)
+    return [] if text == "Unsupported file format" else extract_skills(text)
+
+
+def extract_resume_skills_many(file_paths):
+    return [[] if text == "Unsupported file format" else extract_skills(text) for text in extract_resume_texts(file_paths)]
@@ -0,0 +1,105 @@
+import os
+import re
+import sys
+import threading
+
+# Vocabulary and aliases are shared with the recommender, so ids line up with JobIndex.skills
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "recommendation"))
+from skill_vocabulary import ALIASES, AMBIGUOUS_IN_TEXT, DATASET_PATH, catalog_skills
+
+# Words are letters and digits, plus the + and # of c++ / c#; everything else separates them,
+# so "Power-BI", "power bi" and "POWER BI" all read as the words power, bi
+WORD = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def words(text):
+    return WORD.findall(text.lower())
+
+
+class SkillExtractor:
+    """Aho-Corasick automaton over words, compiled from a skill vocabulary.
+
+    Every spelling of every skill (plus the shared ALIASES, except those
+    too ambiguous in running text) is a word sequence in one trie; failure
+    links let a single left-to-right pass over the resume's words report
+    every occurrence, so the cost is linear in the text no matter how large
+    the vocabulary is. Matching whole words means "excel"
+    is not found inside "excellent".
+
+    Built from catalog_skills, skill_ids are positions in JobIndex.skills;
+    skills returns the names the recommender scores with.
+    """
+
+    def __init__(self, vocabulary, aliases=ALIASES):
+        # Sorted like skill_vocabulary.vocabulary, which catalog_skills already returns
+        self.vocabulary = tuple(sorted(set(vocabulary)))
+        ids = {skill: i for i, skill in enumerate(self.vocabulary)}
+        patterns = [(skill, i) for skill, i in ids.items()]
+        patterns += [
+            (alias, ids[target]) for alias, target in aliases.items()
+            if target in ids and alias not in AMBIGUOUS_IN_TEXT
+        ]
+
+        # goto[state] maps a word to the next state; out[state] holds the skill ids ending there
+        self._goto, self._out = [{}], [set()]
+        for pattern, skill_id in patterns:
+            state = 0
+            for word in words(pattern):
+                if word not in self._goto[state]:
+                    self._goto.append({})
+                    self._out.append(set())
+                    self._goto[state][word] = len(self._goto) - 1
+                state = self._goto[state][word]
+            if state:
+                self._out[state].add(skill_id)
+
+        # Breadth-first failure links: the longest proper suffix of a state that is also a trie path
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for word, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                self._out[child] |= self._out[self._fail[child]]
+                queue.append(child)
+        self._out = [frozenset(found) for found in self._out]
+
+    def skill_ids(self, text):
+        """Sorted ids of the vocabulary skills mentioned in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for word in words(text):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if out[state]:
+                found |= out[state]
+        return sorted(found)
+
+    def skills(self, text):
+        # Vocabulary names, ready to pass as "skills" to /recommend_jobs
+        return [self.vocabulary[i] for i in self.skill_ids(text)]
+
+
+_extractors = {}
+_lock = threading.Lock()
+
+
+def get_extractor(csv_path=DATASET_PATH):
+    # Compiled once per catalog file, and again when the file changes
+    key = (os.path.abspath(csv_path), os.stat(csv_path).st_mtime_ns)
+    with _lock:
+        extractor = _extractors.get(key)
+    if extractor is None:
+        extractor = SkillExtractor(catalog_skills(csv_path))
+        with _lock:
+            _extractors.clear()
+            _extractors[key] = extractor
+    return extractor
+
+
+def extract_skills(text, csv_path=DATASET_PATH):
+    return get_extractor(csv_path).skills(text)
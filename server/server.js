@@ -14,7 +14,7 @@ app.use(express.json()); // Parse JSON request bodies
 // Route to get job recommendations
 app.post("/api/recommend_jobs", async (req, res) => {
     try {
-        const { disabilities, skills, jobType, location, salary } = req.body;
+        const { disabilities, skills, jobType, location, salary, page, per_page, cursor } = req.body;
 
         // Input validation
         if (!disabilities?.length || !skills?.length || !jobType?.length || !location?.length) {
@@ -33,7 +33,11 @@ app.post("/api/recommend_jobs", async (req, res) => {
             disability,
             skills,
             work_mode,
-            location: job_location
+            location: job_location,
+            salary, // Salary range labels; Flask filters jobs to these ranges
+            page,
+            per_page,
+            cursor
         });
 
         console.log("Flask API response:", response.data);